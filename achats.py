@@ -0,0 +1,45 @@
+# 🛒 Préparation et agrégations du dashboard Achats (analysis.py), importables hors Streamlit
+import chrono
+import paresseux
+
+pd = paresseux.module("pandas")
+
+
+# 🧹 Nettoyage et préparation
+def preparer(df):
+    for col in ['montant_commande', 'quantite', 'quantite_dm']:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce')
+
+    if 'date_commande' in df.columns:
+        df['date_commande'] = pd.to_datetime(df['date_commande'], errors='coerce')
+
+    return df.dropna(subset=['montant_commande', 'quantite', 'date_commande'])
+
+
+# L'évolution dans le temps est agrégée à part, selon la période choisie (cf. affichage.serie)
+def agreger(df):
+    # 🔝 Top 10 articles
+    with chrono.etape("groupby designation", "pandas"):
+        top_articles = (
+            df.groupby('designation', observed=True)['montant_commande']
+            .sum()
+            .nlargest(10)
+            .reset_index()
+        )
+
+    # 🍰 Répartition par type d’achat
+    with chrono.etape("groupby type_achat", "pandas"):
+        repartition_type_achat = (
+            df.groupby('type_achat', observed=True)['montant_commande']
+            .sum()
+            .reset_index()
+        )
+
+    return {
+        "total_montant": df['montant_commande'].sum(),
+        # Quantités en float32 (cf. dtypes.py) : le total est cumulé en float64
+        "total_quantite": df['quantite'].astype('float64').sum(),
+        "top_articles": top_articles,
+        "repartition_type_achat": repartition_type_achat,
+    }
@@ -0,0 +1,88 @@
+# 📐 Charge bornée côté navigateur : tables paginées et séries temporelles à résolution adaptative
+# Filtre, tri et découpage sont faits côté serveur en pandas : seule la page visible est envoyée.
+# Les séries sont agrégées au pas le plus fin (jour, semaine, mois…) qui reste sous POINTS_MAX points.
+import math
+
+import paresseux
+
+pd = paresseux.module("pandas")
+
+TAILLES_PAGE = [25, 50, 100, 250]
+POINTS_MAX = 400
+
+# (libellé, fréquence pandas, durée moyenne en jours), du plus fin au plus grossier
+RESOLUTIONS = [
+    ("jour", "D", 1),
+    ("semaine", "W", 7),
+    ("mois", "M", 30.44),
+    ("trimestre", "Q", 91.31),
+    ("année", "Y", 365.25),
+]
+
+
+# 🔎 Recherche insensible à la casse ; sur une colonne category, seules les catégories sont parcourues
+def filtrer(df, recherche, colonnes):
+    motif = (recherche or "").strip().lower()
+    if not motif or not colonnes:
+        return df
+    masque = pd.Series(False, index=df.index)
+    for col in colonnes:
+        if isinstance(df[col].dtype, pd.CategoricalDtype):
+            categories = df[col].cat.categories
+            trouvees = categories[categories.astype(str).str.lower().str.contains(motif, regex=False)]
+            masque |= df[col].isin(trouvees)
+        else:
+            masque |= df[col].astype("string").str.lower().str.contains(motif, regex=False).fillna(False)
+    return df[masque]
+
+
+def trier(df, colonne, ascendant=True):
+    if colonne is None:
+        return df
+    return df.sort_values(colonne, ascending=ascendant, kind="stable", na_position="last")
+
+
+def decouper(df, taille, numero):
+    nb_pages = max(1, math.ceil(len(df) / taille))
+    numero = min(max(1, int(numero)), nb_pages)
+    debut = (numero - 1) * taille
+    return df.iloc[debut:debut + taille], numero, nb_pages
+
+
+# 📄 Table paginée : « cle » distingue les widgets de chaque table de la page
+def tableau_pagine(st, df, cle, colonnes_recherche=None, tri=None, ascendant=True):
+    col_recherche, col_tri, col_ordre, col_taille, col_page = st.columns([3, 2, 1, 1, 1])
+    recherche = col_recherche.text_input("🔎 Rechercher", key=f"{cle}_recherche") if colonnes_recherche else ""
+    colonnes = [None] + list(df.columns)
+    colonne_tri = col_tri.selectbox("Trier par", colonnes, index=colonnes.index(tri), key=f"{cle}_tri")
+    ordre = col_ordre.selectbox("Ordre", ["↑", "↓"], index=0 if ascendant else 1, key=f"{cle}_ordre")
+    taille = col_taille.selectbox("Lignes", TAILLES_PAGE, index=1, key=f"{cle}_taille")
+    numero = col_page.number_input("Page", min_value=1, value=1, step=1, key=f"{cle}_page")
+
+    vue = trier(filtrer(df, recherche, colonnes_recherche), colonne_tri, ordre == "↑")
+    page, numero, nb_pages = decouper(vue, taille, numero)
+    st.dataframe(page, hide_index=True, use_container_width=True)
+    debut = (numero - 1) * taille
+    st.caption(f"Page {numero}/{nb_pages} — lignes {debut + 1 if len(page) else 0:,}–{debut + len(page):,} "
+               f"sur {len(vue):,}")
+
+
+def resolution(debut, fin, points_max=POINTS_MAX):
+    jours = (pd.Timestamp(fin) - pd.Timestamp(debut)).days + 1
+    for libelle, frequence, duree in RESOLUTIONS:
+        if jours / duree <= points_max:
+            return libelle, frequence
+    return RESOLUTIONS[-1][:2]
+
+
+# 📈 Somme de « colonne_valeur » par période entre debut et fin, au pas adapté à l'intervalle
+def serie(df, colonne_date, colonne_valeur, debut=None, fin=None, points_max=POINTS_MAX):
+    dates = df[colonne_date]
+    debut = pd.Timestamp(debut) if debut is not None else dates.min()
+    fin = pd.Timestamp(fin) + pd.Timedelta(days=1) - pd.Timedelta(1) if fin is not None else dates.max()
+    masque = dates.between(debut, fin)
+    libelle, frequence = resolution(debut, fin, points_max)
+    periodes = dates[masque].dt.to_period(frequence).rename(colonne_date)
+    resultat = df.loc[masque, colonne_valeur].astype("float64").groupby(periodes).sum().reset_index()
+    resultat[colonne_date] = resultat[colonne_date].dt.to_timestamp()
+    return resultat, libelle
@@ -0,0 +1,71 @@
+# 🚩 Détection vectorisée des lignes de commande suspectes, appliquée par ingest.py à chaque morceau
+# Contrairement à validation.py, rien n'est rejeté : chaque ligne reçoit un masque de bits dans la
+# colonne « anomalies » (0 = ligne saine), indexée avec date_commande, pour que les dashboards
+# excluent les catégories choisies (« anomalies IN (...) », cf. masques_sans) sans recalcul.
+# Une répétition est signalée sur les occurrences qui suivent la première, y compris d'un morceau
+# à l'autre (empreintes des lignes déjà vues).
+# montant_commande est le total de la commande, répété sur chacune de ses lignes : aucune règle ne
+# peut donc en tirer un prix unitaire par ligne, ni comparer les montants des lignes d'une commande.
+import numpy as np
+import pandas as pd
+
+from schema import TABLES
+
+# 🏷️ Bits du masque (4 et 8, prix unitaire aberrant et montant répété, sont retirés et ne sont pas réattribués)
+DOUBLON_EXACT = 1    # toutes les colonnes identiques à une ligne précédente
+QUASI_DOUBLON = 2    # même commande et même article qu'une ligne précédente (quantité ou date différente)
+
+LIBELLES = {
+    DOUBLON_EXACT: "doublon exact",
+    QUASI_DOUBLON: "quasi-doublon",
+}
+
+COLONNES_QUASI = ["commande_id", "article_id"]
+
+
+def empreintes(df, colonnes):
+    return pd.util.hash_pandas_object(df[colonnes], index=False).to_numpy()
+
+
+# 🧮 Masques possibles ne portant aucun des bits exclus, pour « anomalies IN (...) » ; les bits
+# retirés restent couverts (lignes chargées avant leur retrait) pour ne pas masquer ces lignes
+def masques_sans(exclus, bits=4):
+    exclus = sum(set(exclus))
+    return [masque for masque in range(1 << bits) if not masque & exclus]
+
+
+# 🔎 Libellés des anomalies d'un masque, pour l'affichage
+def decrire(masque):
+    return ", ".join(libelle for bit, libelle in LIBELLES.items() if int(masque) & bit)
+
+
+class DetecteurAnomalies:
+    def __init__(self):
+        self.vues = {cle: np.empty(0, dtype=np.uint64) for cle in ("exact", "quasi")}
+        self.signalees = dict.fromkeys(LIBELLES, 0)
+
+    # Empreinte déjà rencontrée plus haut dans le morceau ou dans un morceau précédent
+    def deja_vues(self, cle, valeurs):
+        repetees = pd.Series(valeurs).duplicated().to_numpy() | np.isin(valeurs, self.vues[cle])
+        self.vues[cle] = np.union1d(self.vues[cle], valeurs)
+        return repetees
+
+    # 🚩 Ajoute la colonne « anomalies » au morceau (préparé et numéroté par ingest.py)
+    def marquer(self, df):
+        colonnes = [col for col, _ in TABLES["commandes"]["colonnes"]]
+        exact = self.deja_vues("exact", empreintes(df, colonnes))
+        quasi_vu = self.deja_vues("quasi", empreintes(df, COLONNES_QUASI))
+
+        drapeaux = {
+            DOUBLON_EXACT: exact,
+            QUASI_DOUBLON: quasi_vu & ~exact,
+        }
+        masque = np.zeros(len(df), dtype=np.uint8)
+        for bit, drapeau in drapeaux.items():
+            masque |= np.where(drapeau, bit, 0).astype(np.uint8)
+            self.signalees[bit] += int(drapeau.sum())
+        df["anomalies"] = masque
+        return df
+
+    def resume(self):
+        return ", ".join(f"{n} {LIBELLES[bit]}" for bit, n in self.signalees.items() if n)
@@ -0,0 +1,102 @@
+# ▶️ Lancement depuis la racine du dépôt : python -m benchmarks.bench_demarrage [--pages test.py] [--repetitions 5]
+# 🥶 Démarrage à froid des dashboards : chaque mesure est un nouveau processus Python, comme un
+# nouveau serveur Streamlit. La page est exécutée sans navigateur (streamlit.testing.v1.AppTest) :
+# - imports : import des modules de la page (streamlit compris) ;
+# - squelette : délai jusqu'au premier affichage du titre (chrono.squelette_affiche) ;
+# - total : page complète (requêtes comprises si la base est joignable).
+# « avant » rétablit les imports immédiats (ONCF_IMPORTS_IMMEDIATS=1), « après » les diffère (paresseux.py).
+import argparse
+import datetime
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+DOSSIER_RESULTATS = "benchmarks/resultats"
+PAGES = ["test.py", "analysis.py", "dashboard.py"]
+MODES = {"avant": "1", "apres": "0"}
+
+# 🧒 Script du processus mesuré : les temps sont relatifs à son tout début
+ENFANT = r"""
+import ast, importlib, json, sys, time
+debut = time.perf_counter()
+racine, page, delai = sys.argv[1], sys.argv[2], float(sys.argv[3])
+sys.path.insert(0, racine)
+with open(f"{racine}/{page}", encoding="utf-8") as f:
+    arbre = ast.parse(f.read())
+modules = [alias.name for noeud in arbre.body if isinstance(noeud, ast.Import) for alias in noeud.names]
+modules += [noeud.module for noeud in arbre.body if isinstance(noeud, ast.ImportFrom)]
+for nom in modules:
+    importlib.import_module(nom)
+imports = time.perf_counter()
+
+from streamlit.testing.v1 import AppTest
+app = AppTest.from_file(f"{racine}/{page}", default_timeout=delai)
+app.run()
+fin = time.perf_counter()
+
+import chrono
+rendu = chrono.premiers_rendus.get(page)
+print(json.dumps({
+    "imports_ms": (imports - debut) * 1000,
+    "squelette_ms": (rendu - debut) * 1000 if rendu is not None else None,
+    "total_ms": (fin - debut) * 1000,
+    "erreurs": [str(e.value) for e in app.exception],
+}))
+"""
+
+
+def mesurer(page, mode, delai):
+    env = dict(os.environ, ONCF_IMPORTS_IMMEDIATS=MODES[mode])
+    sortie = subprocess.run(
+        [sys.executable, "-c", ENFANT, os.getcwd(), page, str(delai)],
+        env=env, capture_output=True, text=True, check=True
+    )
+    return json.loads(sortie.stdout.strip().splitlines()[-1])
+
+
+def mediane(mesures, cle):
+    valeurs = [m[cle] for m in mesures if m[cle] is not None]
+    return statistics.median(valeurs) if valeurs else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Temps de démarrage à froid des dashboards, avant/après imports différés")
+    parser.add_argument("--pages", nargs="+", default=PAGES)
+    parser.add_argument("--repetitions", type=int, default=5)
+    parser.add_argument("--delai", type=float, default=120, help="durée maximale d'une exécution de page (s)")
+    parser.add_argument("--sortie", help="fichier JSON (par défaut benchmarks/resultats/demarrage-<date>.json)")
+    args = parser.parse_args()
+
+    resultats = []
+    print(f"{'page':<16}{'mode':<8}{'imports':>12}{'squelette':>12}{'total':>12}")
+    for page in args.pages:
+        for mode in MODES:
+            mesures = [mesurer(page, mode, args.delai) for _ in range(args.repetitions)]
+            resultat = {
+                "page": page,
+                "mode": mode,
+                **{cle: mediane(mesures, cle) for cle in ("imports_ms", "squelette_ms", "total_ms")},
+                "erreurs": sorted({e for m in mesures for e in m["erreurs"]}),
+            }
+            resultats.append(resultat)
+            colonnes = "".join(
+                f"{resultat[cle]:>10,.0f}ms" if resultat[cle] is not None else f"{'—':>12}"
+                for cle in ("imports_ms", "squelette_ms", "total_ms")
+            )
+            print(f"{page:<16}{mode:<8}{colonnes}")
+            for erreur in resultat["erreurs"]:
+                print(f"  ⚠️ {erreur}")
+
+    maintenant = datetime.datetime.now()
+    sortie = args.sortie or os.path.join(DOSSIER_RESULTATS, f"demarrage-{maintenant:%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(sortie) or ".", exist_ok=True)
+    with open(sortie, "w", encoding="utf-8") as f:
+        json.dump({"date": maintenant.isoformat(timespec="seconds"), "repetitions": args.repetitions,
+                   "resultats": resultats}, f, indent=2, ensure_ascii=False)
+    print(f"\n💾 Résultats écrits dans {sortie}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+# ▶️ Lancement depuis la racine du dépôt : python -m benchmarks.bench_index [--sans-limite]
+import argparse
+import statistics
+import time
+
+import pandas as pd
+from sqlalchemy import text
+
+from connexion import creer_engine
+from schema import TABLES
+
+# 🔌 Connexion à la base MySQL (mêmes paramètres que les dashboards)
+engine = creer_engine()
+
+# 🏷️ Préfixe des copies sans clé ni index (CREATE TABLE ... AS SELECT ne copie pas les index)
+PREFIXE_SANS_INDEX = "bench_sans_index_"
+
+# 📥 Requête de jointure du dashboard Achats (analysis.py)
+REQUETE_JOINTURE = """
+SELECT
+    c.commande_id,
+    c.date_commande,
+    c.quantite,
+    c.fournisseur_id,
+    c.article_id,
+    c.libelle_article,
+    c.type_achat,
+    c.montant_commande,
+    a.designation,
+    a.famille_article,
+    f.fournisseur_id AS fournisseur_fk,
+    dm.quantite AS quantite_dm
+FROM {commandes} c
+LEFT JOIN {articles} a ON c.article_id = a.article_id
+LEFT JOIN {fournisseurs} f ON c.fournisseur_id = f.fournisseur_id
+LEFT JOIN {demandes_matiere} dm ON c.article_id = dm.article_id
+{limite}
+"""
+
+
+def requete(prefixe="", limite="LIMIT 1000"):
+    return REQUETE_JOINTURE.format(limite=limite, **{nom: prefixe + nom for nom in TABLES})
+
+
+def creer_copies_sans_index(conn):
+    for nom in TABLES:
+        conn.execute(text(f"DROP TABLE IF EXISTS {PREFIXE_SANS_INDEX}{nom}"))
+        conn.execute(text(f"CREATE TABLE {PREFIXE_SANS_INDEX}{nom} AS SELECT * FROM {nom}"))
+
+
+def supprimer_copies_sans_index(conn):
+    for nom in TABLES:
+        conn.execute(text(f"DROP TABLE IF EXISTS {PREFIXE_SANS_INDEX}{nom}"))
+
+
+# ⏱️ Durée médiane sur plusieurs exécutions et lignes examinées selon EXPLAIN
+def mesurer(conn, sql, repetitions):
+    durees = []
+    for _ in range(repetitions):
+        debut = time.perf_counter()
+        lignes = len(pd.read_sql(text(sql), conn))
+        durees.append(time.perf_counter() - debut)
+    plan = pd.read_sql(text("EXPLAIN " + sql), conn)
+    return {
+        "mediane_s": statistics.median(durees),
+        "lignes_retournees": lignes,
+        "lignes_examinees": int(plan["rows"].fillna(0).astype("int64").prod()),
+        "plan": plan[["table", "type", "key", "rows"]],
+    }
+
+
+def afficher(titre, resultat):
+    print(f"\n=== {titre} ===")
+    print(f"durée médiane     : {resultat['mediane_s'] * 1000:,.1f} ms")
+    print(f"lignes retournées : {resultat['lignes_retournees']:,}")
+    print(f"lignes examinées  : {resultat['lignes_examinees']:,} (produit des estimations EXPLAIN)")
+    print(resultat["plan"].to_string(index=False))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Jointure du dashboard Achats avec et sans index")
+    parser.add_argument("--repetitions", type=int, default=5)
+    parser.add_argument("--sans-limite", action="store_true",
+                        help="exécuter la jointure complète au lieu de LIMIT 1000")
+    args = parser.parse_args()
+    limite = "" if args.sans_limite else "LIMIT 1000"
+
+    with engine.begin() as conn:
+        creer_copies_sans_index(conn)
+    try:
+        with engine.connect() as conn:
+            avant = mesurer(conn, requete(PREFIXE_SANS_INDEX, limite), args.repetitions)
+            apres = mesurer(conn, requete("", limite), args.repetitions)
+    finally:
+        with engine.begin() as conn:
+            supprimer_copies_sans_index(conn)
+
+    afficher("Avant : tables sans clés ni index", avant)
+    afficher("Après : schéma avec clés et index", apres)
+    if apres["mediane_s"] > 0:
+        print(f"\n🚀 Accélération : x{avant['mediane_s'] / apres['mediane_s']:.1f}")
+
+
+if __name__ == "__main__":
+    main()
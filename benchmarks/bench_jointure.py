@@ -0,0 +1,70 @@
+# ▶️ Lancement depuis la racine du dépôt : python -m benchmarks.bench_jointure [--fan-out-complet]
+import argparse
+import statistics
+import time
+
+import pandas as pd
+from sqlalchemy import text
+
+import queries
+from benchmarks.bench_index import engine, requete
+
+# 🔁 Colonnes utilisées par l'ancien dashboard pour défaire l'explosion de la jointure
+COLONNES_DEDOUBLONNAGE = [
+    'commande_id', 'date_commande', 'quantite', 'fournisseur_id', 'article_id', 'libelle_article',
+    'type_achat', 'montant_commande', 'designation', 'famille_article', 'fournisseur_fk', 'quantite_dm'
+]
+
+
+# 📈 Lignes lues par le moteur : somme des compteurs Handler_read_* de la session
+def lignes_lues(conn):
+    statut = pd.read_sql(text("SHOW SESSION STATUS LIKE 'Handler_read%'"), conn)
+    return int(pd.to_numeric(statut["Value"]).sum())
+
+
+def mesurer(conn, sql, repetitions):
+    durees, lues = [], []
+    for _ in range(repetitions):
+        avant = lignes_lues(conn)
+        debut = time.perf_counter()
+        df = pd.read_sql(text(sql), conn)
+        durees.append(time.perf_counter() - debut)
+        lues.append(lignes_lues(conn) - avant)
+    dedoublonne = df.drop_duplicates(subset=COLONNES_DEDOUBLONNAGE)
+    return {
+        "mediane_s": statistics.median(durees),
+        "lignes_lues": statistics.median(lues),
+        "lignes_retournees": len(df),
+        "lignes_apres_dedoublonnage": len(dedoublonne),
+        "montant_total": pd.to_numeric(dedoublonne["montant_commande"], errors="coerce").sum(),
+    }
+
+
+def afficher(titre, resultat):
+    print(f"\n=== {titre} ===")
+    print(f"durée médiane              : {resultat['mediane_s'] * 1000:,.1f} ms")
+    print(f"lignes lues (Handler_read) : {resultat['lignes_lues']:,.0f}")
+    print(f"lignes retournées          : {resultat['lignes_retournees']:,}")
+    print(f"après drop_duplicates      : {resultat['lignes_apres_dedoublonnage']:,}")
+    print(f"montant total (KPI)        : {resultat['montant_total']:,.2f} MAD")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ancienne jointure du dashboard Achats contre la requête pré-agrégée")
+    parser.add_argument("--repetitions", type=int, default=3)
+    parser.add_argument("--fan-out-complet", action="store_true",
+                        help="mesurer aussi l'ancienne jointure sans LIMIT (peut être très volumineuse)")
+    args = parser.parse_args()
+
+    mesures = [("Ancienne requête (LIMIT 1000)", requete("", "LIMIT 1000"))]
+    if args.fan_out_complet:
+        mesures.append(("Ancienne requête sans LIMIT", requete("", "")))
+    mesures.append(("Nouvelle requête pré-agrégée", queries.REQUETE_ACHATS))
+
+    with engine.connect() as conn:
+        for titre, sql in mesures:
+            afficher(titre, mesurer(conn, sql, args.repetitions))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+# ▶️ Lancement depuis la racine du dépôt : python -m benchmarks.bench_memoire [--utilisateurs 50]
+import argparse
+
+import dtypes
+import queries
+from connexion import creer_engine
+
+
+# 📥 DataFrames tels que les dashboards les chargent, avant le plan de types
+def charger_frames(lire):
+    return {
+        "articles (test.py)": queries.articles(lire),
+        "agg_global (test.py)": queries.agg_global(lire),
+        "agg_par_annee (test.py)": queries.agg_par_annee(lire),
+        "detail commandes (test.py)": lire(
+            "SELECT fournisseur_id, article_id, quantite, date_commande FROM commandes"
+        ),
+        "commandes achats (analysis.py)": queries.commandes_achats(lire),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mémoire des DataFrames des dashboards avant/après plan de types")
+    parser.add_argument("--utilisateurs", type=int, default=1,
+                        help="nombre de sessions simultanées pour l'estimation totale")
+    args = parser.parse_args()
+
+    rapport = dtypes.rapport_memoire(charger_frames(queries.lecteur(creer_engine())))
+    print(rapport.to_string(index=False, float_format=lambda v: f"{v:,.2f}"))
+
+    total = rapport.iloc[-1]
+    print(f"\n👥 {args.utilisateurs} session(s) : {total['avant_mo'] * args.utilisateurs:,.1f} Mo avant, "
+          f"{total['apres_mo'] * args.utilisateurs:,.1f} Mo après")
+
+
+if __name__ == "__main__":
+    main()
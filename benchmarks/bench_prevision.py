@@ -0,0 +1,80 @@
+# ▶️ Lancement depuis la racine du dépôt : python -m benchmarks.bench_prevision [--articles 1000 10000] [--mois 60]
+# ⏱️ prevision.py sur un historique synthétique article × mois : modèle vectorisé sur la matrice
+# entière, comparé à la même récurrence appliquée article par article en Python.
+import argparse
+import statistics
+import time
+
+import numpy as np
+import pandas as pd
+
+import prevision
+
+
+# 🎲 Lignes (article, mois, quantité) : demande de base, saisonnalité annuelle et mois sans commande
+def historique(nb_articles, nb_mois, graine=42):
+    rng = np.random.default_rng(graine)
+    base = rng.gamma(2.0, 20.0, size=(nb_articles, 1))
+    saison = 1 + 0.4 * np.sin(2 * np.pi * (np.arange(nb_mois) + rng.integers(0, 12, size=(nb_articles, 1))) / 12)
+    quantites = rng.poisson(base * saison) * (rng.random((nb_articles, nb_mois)) > 0.3)
+    articles, mois = np.nonzero(quantites)
+    return pd.DataFrame({
+        "article_id": pd.Index(articles).map(lambda i: f"A{i:06d}"),
+        "mois": pd.period_range("2005-01", periods=nb_mois, freq="M").to_timestamp()[mois],
+        "quantite_totale": quantites[articles, mois],
+    })
+
+
+# 🐢 Référence : une série pandas par article, lissage récursif et moyenne saisonnière en boucle
+def prevoir_par_article(df, alpha=prevision.ALPHA, saison=prevision.SAISON, annees=prevision.ANNEES_SAISON):
+    tous_mois = pd.period_range(df["mois"].min(), df["mois"].max(), freq="M").to_timestamp()
+    resultat = {}
+    for article, groupe in df.groupby("article_id", sort=False):
+        serie = groupe.set_index("mois")["quantite_totale"].reindex(tous_mois, fill_value=0).to_numpy(dtype="float64")
+        niveau = serie[0]
+        for valeur in serie[1:]:
+            niveau = alpha * valeur + (1 - alpha) * niveau
+        meme_mois = [serie[len(serie) - saison * k] for k in range(1, annees + 1) if len(serie) - saison * k >= 0]
+        recent = serie[max(0, len(serie) - saison * annees):].mean()
+        observations = sum(valeur > 0 for valeur in meme_mois)
+        indice = np.mean(meme_mois) / recent if observations >= prevision.OBSERVATIONS_MIN and recent > 0 else 1.0
+        resultat[article] = niveau * min(max(indice, prevision.INDICE_MIN), prevision.INDICE_MAX)
+    return pd.Series(resultat)
+
+
+def mesurer(fonction, repetitions):
+    durees = []
+    for _ in range(repetitions):
+        debut = time.perf_counter()
+        resultat = fonction()
+        durees.append(time.perf_counter() - debut)
+    return statistics.median(durees), resultat
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Temps de prevision.py selon le nombre d'articles")
+    parser.add_argument("--articles", type=int, nargs="+", default=[1_000, 5_000, 10_000])
+    parser.add_argument("--mois", type=int, default=60)
+    parser.add_argument("--repetitions", type=int, default=3)
+    parser.add_argument("--sans-boucle", action="store_true", help="ne mesure pas la référence article par article")
+    args = parser.parse_args()
+
+    for nb_articles in args.articles:
+        df = historique(nb_articles, args.mois)
+        duree_matrice, (valeurs, articles, _) = mesurer(lambda: prevision.matrice(df), args.repetitions)
+        duree_modele, vectorise = mesurer(lambda: prevision.prevoir(valeurs), args.repetitions)
+        duree_totale, _ = mesurer(lambda: prevision.suggestions(df), args.repetitions)
+        print(f"\n=== {nb_articles:,} articles × {args.mois} mois ({len(df):,} lignes) ===")
+        print(f"matrice article × mois  : {duree_matrice * 1000:,.1f} ms")
+        print(f"modèle vectorisé        : {duree_modele * 1000:,.1f} ms")
+        print(f"suggestions complètes   : {duree_totale * 1000:,.1f} ms")
+        if args.sans_boucle:
+            continue
+        duree_boucle, reference = mesurer(lambda: prevoir_par_article(df), 1)
+        ecart = np.abs(pd.Series(vectorise, index=articles) - reference.reindex(articles)).max()
+        print(f"boucle par article      : {duree_boucle * 1000:,.1f} ms "
+              f"(× {duree_boucle / max(duree_modele + duree_matrice, 1e-9):,.0f}, écart max {ecart:.2e})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,271 @@
+# ▶️ Lancement depuis la racine du dépôt : python -m benchmarks.bench_suite --echelles 1 10 100 [--moteur sqlite]
+# 📏 Suite de benchmarks sur données synthétiques (cf. generer_donnees.py) : débit d'ingestion
+# par table, requêtes et agrégations de test.py, requête et agrégations d'analysis.py.
+# Les résultats sont écrits en JSON dans benchmarks/resultats/ pour comparer les exécutions.
+# --moteur mysql : base dédiée (--base, jamais la base des dashboards) chargée par ingest.py ;
+# --moteur sqlite : base embarquée, sans serveur, chargée avec la même préparation des CSV.
+import argparse
+import datetime
+import json
+import os
+import platform
+import re
+import statistics
+import time
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+
+import achats
+import affichage
+import esquisses
+import ingest
+import kpis
+import queries
+import rollups
+import validation
+from benchmarks import generer_donnees
+from connexion import DATABASE_URL
+from schema import TABLES
+
+DOSSIER_RESULTATS = "benchmarks/resultats"
+
+# 🐬 Requêtes de test.py qui utilisent des fonctions propres à MySQL (DATE_FORMAT, STDDEV_SAMP)
+REQUETES_MYSQL_SEULEMENT = {"quantites_mensuelles", "volatilite"}
+
+
+# 🔁 Les tables lisent temporairement les CSV synthétiques, la quarantaine reste à côté d'eux
+@contextmanager
+def fichiers_synthetiques(chemins, dossier):
+    originaux = {nom: TABLES[nom]["fichier"] for nom in chemins}
+    quarantaine = validation.DOSSIER_QUARANTAINE
+    try:
+        for nom, chemin in chemins.items():
+            TABLES[nom]["fichier"] = chemin
+        validation.DOSSIER_QUARANTAINE = os.path.join(dossier, "quarantaine")
+        yield
+    finally:
+        for nom, chemin in originaux.items():
+            TABLES[nom]["fichier"] = chemin
+        validation.DOSSIER_QUARANTAINE = quarantaine
+
+
+def mediane(fonction, repetitions):
+    durees = []
+    for _ in range(repetitions):
+        debut = time.perf_counter()
+        fonction()
+        durees.append(time.perf_counter() - debut)
+    return statistics.median(durees)
+
+
+def debit(table, lignes, secondes, rejetees=None):
+    return {"table": table, "lignes": lignes, "secondes": secondes, "rejetees": rejetees,
+            "lignes_par_s": lignes / secondes if lignes is not None and secondes > 0 else None}
+
+
+# 🐬 Ingestion par ingest.py dans une base dédiée ; le pilote n'est requis qu'ici
+def ingerer_mysql(base):
+    import mysql.connector
+
+    config = {cle: valeur for cle, valeur in ingest.MYSQL_CONFIG.items() if cle != "database"}
+    conn = mysql.connector.connect(**config)
+    cursor = conn.cursor()
+    cursor.execute(f"CREATE DATABASE IF NOT EXISTS `{base}`")
+    cursor.execute(f"USE `{base}`")
+    ingest.creer_table_watermarks(cursor)
+    ingest.creer_table_ingest_runs(cursor)
+    cursor.close()
+    resultats = [
+        ingest.charger_table(conn, nom, parquet=False)
+        for nom in TABLES
+    ]
+    conn.close()
+    engine = create_engine(make_url(DATABASE_URL).set(database=base))
+    return [debit(r["table"], r["lignes"], r["secondes"], r["rejetees"]) for r in resultats], engine
+
+
+# 🪶 Rollups reconstruits avec pandas à partir des spécifications de rollups.py
+def construire_rollups_sqlite(engine):
+    sources = {}
+    for nom, spec in rollups.ROLLUPS.items():
+        source = spec["source"]
+        if source not in sources:
+            sources[source] = pd.read_sql_table(source, engine)
+            if "date_commande" in sources[source].columns:
+                dates = pd.to_datetime(sources[source]["date_commande"], errors="coerce")
+                sources[source]["annee"] = dates.dt.year.astype("Int64")
+                sources[source]["mois"] = dates.dt.strftime("%Y-%m-01")
+        df = sources[source]
+        groupes = [col for col, _, _ in spec["groupes"]]
+        agregations = {}
+        for col, expression, _ in spec["mesures"]:
+            somme = re.fullmatch(r"SUM\((\w+)\)", expression)
+            agregations[col] = (somme.group(1), "sum") if somme else (groupes[0], "size")
+        df.groupby(groupes, dropna=False).agg(**agregations).reset_index().to_sql(
+            nom, engine, if_exists="replace", index=False
+        )
+
+
+# 🪶 Ingestion dans SQLite avec la même lecture, validation et préparation qu'ingest.py
+def ingerer_sqlite(chemin):
+    if os.path.exists(chemin):
+        os.remove(chemin)
+    engine = create_engine(f"sqlite:///{chemin}")
+    resultats = []
+    for nom in TABLES:
+        debut = time.perf_counter()
+        lignes = 0
+        validateur = validation.Validateur(nom)
+        for i, morceau in enumerate(ingest.morceaux_prepares(nom, validateur)):
+            morceau.to_sql(nom, engine, if_exists="replace" if i == 0 else "append", index=False)
+            lignes += len(morceau)
+        resultats.append(debit(nom, lignes, time.perf_counter() - debut, validateur.rejetees))
+    debut = time.perf_counter()
+    construire_rollups_sqlite(engine)
+    resultats.append(debit("rollups", None, time.perf_counter() - debut))
+    return resultats, engine
+
+
+# 📊 test.py : chaque requête, puis le calcul complet des KPIs sans cache
+def bench_test(lire, repetitions, moteur):
+    requetes = {
+        "articles": lambda: queries.articles(lire),
+        "demandes_par_article": lambda: queries.demandes_par_article(lire),
+        "agg_global": lambda: queries.agg_global(lire),
+        "agg_par_annee": lambda: queries.agg_par_annee(lire),
+        "fournisseurs_par_article": lambda: queries.fournisseurs_par_article(lire),
+        "top_fournisseurs": lambda: queries.top_fournisseurs(lire),
+        "quantites_mensuelles": lambda: queries.quantites_mensuelles(lire),
+        "volatilite": lambda: queries.volatilite(lire),
+    }
+    resultats = {
+        nom: mediane(requete, repetitions)
+        for nom, requete in requetes.items()
+        if moteur == "mysql" or nom not in REQUETES_MYSQL_SEULEMENT
+    }
+
+    # Requêtes exactes ici ; les esquisses sont mesurées à part, construites depuis le rollup de la base
+    kpis.ESQUISSES = False
+
+    def kpis_sans_cache():
+        kpis.vider()
+        kpis.indicateurs(lire, None, None, None)
+        kpis.indicateurs_fournisseurs(lire, None, None, None)
+        kpis.top_surstock(lire, None, None, None)
+        kpis.top_sousstock(lire, None, None, None)
+        kpis.montant_par_annee(lire, None, None, None)
+
+    resultats["kpis_complets"] = mediane(kpis_sans_cache, repetitions)
+    kpis.vider()
+
+    rollup = lire("SELECT article_id, fournisseur_id, mois, montant_commande FROM rollup_article_fournisseur_mois")
+    resultats["esquisses_construction"] = mediane(lambda: esquisses.construire(rollup), repetitions)
+    par_mois = esquisses.construire(rollup)
+
+    def kpis_esquisses():
+        fusion = esquisses.fusionner(par_mois)
+        esquisses.indicateurs_fournisseurs(fusion)
+        fusion.top_fournisseurs()
+        fusion.top_articles()
+
+    resultats["kpis_esquisses"] = mediane(kpis_esquisses, repetitions)
+    return resultats
+
+
+# 🛒 analysis.py : requête des lignes de commande, puis préparation et agrégations pandas
+def agreger_achats(df):
+    df = achats.preparer(df)
+    return achats.agreger(df), affichage.serie(df, 'date_commande', 'montant_commande')
+
+
+def bench_analysis(lire, repetitions):
+    df = queries.commandes_achats(lire)
+    return {
+        "lignes": len(df),
+        "requete_achats": mediane(lambda: queries.commandes_achats(lire), repetitions),
+        "agregations_pandas": mediane(lambda: agreger_achats(df.copy()), repetitions),
+    }
+
+
+def executer(echelle, args):
+    dossier = os.path.join(args.dossier, f"echelle_{echelle:g}")
+    debut = time.perf_counter()
+    chemins = generer_donnees.generer(dossier, echelle, args.graine)
+    generation = time.perf_counter() - debut
+
+    with fichiers_synthetiques(chemins, dossier):
+        if args.moteur == "mysql":
+            ingestion, engine = ingerer_mysql(args.base)
+        else:
+            ingestion, engine = ingerer_sqlite(os.path.join(dossier, "bench.sqlite"))
+    lire = queries.lecteur(engine)
+    resultat = {
+        "echelle": echelle,
+        "fichiers_mo": {nom: os.path.getsize(chemin) / 1_000_000 for nom, chemin in chemins.items()},
+        "generation_s": generation,
+        "ingestion": ingestion,
+        "test_py_s": bench_test(lire, args.repetitions, args.moteur),
+        "analysis_py_s": bench_analysis(lire, args.repetitions),
+    }
+    engine.dispose()
+    return resultat
+
+
+def afficher(resultat):
+    print(f"\n=== Échelle {resultat['echelle']:g} ===")
+    for r in resultat["ingestion"]:
+        lignes = "" if r["lignes"] is None else f"{r['lignes']:>12,}"
+        debit_s = "" if r["lignes_par_s"] is None else f"{r['lignes_par_s']:>14,.0f} lignes/s"
+        rejetees = f"{r['rejetees']:>8,} rejetée(s)" if r["rejetees"] else ""
+        print(f"  ingestion {r['table']:<20}{lignes:>12}{r['secondes']:>10.2f} s{debit_s}{rejetees}")
+    for nom, secondes in resultat["test_py_s"].items():
+        print(f"  test.py     {nom:<28}{secondes * 1000:>10.1f} ms")
+    analysis = resultat["analysis_py_s"]
+    print(f"  analysis.py requete_achats ({analysis['lignes']:,} lignes){analysis['requete_achats'] * 1000:>10.1f} ms")
+    print(f"  analysis.py agregations_pandas{analysis['agregations_pandas'] * 1000:>18.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks d'ingestion et des dashboards sur données synthétiques")
+    parser.add_argument("--echelles", type=float, nargs="+", default=[1, 10],
+                        help="multiples de la taille actuelle de Commande.csv")
+    parser.add_argument("--moteur", choices=["mysql", "sqlite"], default="mysql")
+    parser.add_argument("--base", default="oncf_bench", help="base MySQL dédiée au benchmark (écrasée)")
+    parser.add_argument("--dossier", default="data/synthetique")
+    parser.add_argument("--graine", type=int, default=0)
+    parser.add_argument("--repetitions", type=int, default=3)
+    parser.add_argument("--sortie", help="fichier JSON (par défaut benchmarks/resultats/suite-<date>.json)")
+    args = parser.parse_args()
+
+    resultats = []
+    for echelle in args.echelles:
+        resultats.append(executer(echelle, args))
+        afficher(resultats[-1])
+
+    maintenant = datetime.datetime.now()
+    sortie = args.sortie or os.path.join(DOSSIER_RESULTATS, f"suite-{maintenant:%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(sortie) or ".", exist_ok=True)
+    with open(sortie, "w", encoding="utf-8") as f:
+        json.dump({
+            "date": maintenant.isoformat(timespec="seconds"),
+            "moteur": args.moteur,
+            "graine": args.graine,
+            "repetitions": args.repetitions,
+            "environnement": {
+                "python": platform.python_version(),
+                "pandas": pd.__version__,
+                "numpy": np.__version__,
+                "machine": platform.machine(),
+                "processeurs": os.cpu_count(),
+            },
+            "resultats": resultats,
+        }, f, indent=2, ensure_ascii=False, default=str)
+    print(f"\n💾 Résultats écrits dans {sortie}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+# ▶️ Lancement depuis la racine du dépôt : python -m benchmarks.generer_donnees --echelle 10 [--dossier data/synthetique]
+# 🧪 CSV synthétiques Article/Commande/Fournisseur/DM, mêmes colonnes que les fichiers réels.
+# Échelle 1 ≈ Commande.csv actuel (~1 100 commandes, ~38 000 lignes). Les distributions reprennent
+# celles observées : popularité des articles et des fournisseurs très concentrée (Zipf), commandes
+# de 1 à ~2 000 lignes (médiane ~10) avec un seul fournisseur et un montant répété sur chaque ligne,
+# articles répétés dans une même commande. Une petite part de valeurs « null » et d'identifiants
+# entourés d'espaces (nettoyés), et de valeurs invalides (rejetées en quarantaine : colonne
+# obligatoire vide, quantité ou montant négatif, texte dans une colonne numérique, référence
+# inconnue, clé primaire répétée) exerce l'étape de validation.
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from schema import TABLES
+
+# 📏 Tailles à l'échelle 1 ; articles et fournisseurs croissent en √échelle (catalogues plus stables)
+COMMANDES = 1_100
+ARTICLES = 10_000
+FOURNISSEURS = 350
+DEMANDES = 20_000
+LIBELLES = 530
+
+ANNEES = (2004, 2024)
+TAUX_ANOMALIES = 0.001
+
+# En-tête réel de Commande.csv (les autres fichiers reprennent les noms du schéma)
+ENTETE_COMMANDES = [
+    "commande_id", "date_commande", "quantite", "fournisseur_id", "article_id", "libelle_article",
+    "type_achat", "montant_commande", "montant_offre", "date", "mode_paiement",
+]
+
+DIRECTIONS = ["DMT", "DI", "DV", "DF", "DRH", "DSI"]
+MODES_PAIEMENT = (["A", "D", "B", "C", "E"], [0.852, 0.065, 0.042, 0.040, 0.001])
+# Plus de commandes en fin d'année budgétaire
+POIDS_MOIS = np.array([0.7, 0.8, 0.9, 0.9, 1.0, 1.1, 1.0, 0.8, 1.0, 1.1, 1.3, 1.4])
+
+
+def tailles(echelle):
+    racine = np.sqrt(echelle)
+    return {
+        "commandes": max(1, int(COMMANDES * echelle)),
+        "articles": max(10, int(ARTICLES * racine)),
+        "fournisseurs": max(5, int(FOURNISSEURS * racine)),
+        "demandes": max(1, int(DEMANDES * echelle)),
+    }
+
+
+# 🏷️ Identifiants au format ONCF : 6 chiffres, une lettre, 2 chiffres (ex. 571239X08)
+def identifiants(n, decalage=0):
+    i = np.arange(n) + decalage
+    lettres = np.array(list("ABCDEFGHIJKLMNOPQRSTUVWXYZ"))[i % 26]
+    return pd.Series([f"{a:06d}{b}{c:02d}" for a, b, c in zip(i, lettres, (i // 26) % 100)])
+
+
+def zipf(rng, n, taille, a=1.3):
+    return (rng.zipf(a, taille) - 1) % n
+
+
+# 🧨 Quelques valeurs « null » et identifiants entourés d'espaces
+def salir(rng, df, colonnes_null, colonnes_id):
+    for col in colonnes_null:
+        df[col] = df[col].astype(object)
+        df.loc[rng.random(len(df)) < TAUX_ANOMALIES, col] = "null"
+    for col in colonnes_id:
+        masque = rng.random(len(df)) < TAUX_ANOMALIES
+        df.loc[masque, col] = " " + df.loc[masque, col].astype(str) + " "
+    return df
+
+
+# 🚫 Valeurs que validation.py doit rejeter, chacune sur une part TAUX_ANOMALIES des lignes
+def invalider(rng, df, obligatoires=(), positifs=(), numeriques=(), references=(), doublons=False):
+    def tirage():
+        return rng.random(len(df)) < TAUX_ANOMALIES
+
+    for col in obligatoires:
+        df[col] = df[col].astype(object)
+        df.loc[tirage(), col] = "null"
+    for col in positifs:
+        masque = tirage()
+        df[col] = df[col].astype(object)
+        df.loc[masque, col] = "-" + df.loc[masque, col].astype(str)
+    for col in numeriques:
+        df[col] = df[col].astype(object)
+        df.loc[tirage(), col] = "n/a"
+    for col in references:
+        masque = tirage()
+        df.loc[masque, col] = [f"INCONNU{i:04d}" for i in range(masque.sum())]
+    if doublons:
+        # Lignes répétées en fin de fichier : la première occurrence est chargée, les suivantes rejetées
+        df = pd.concat([df, df[tirage()]], ignore_index=True)
+    return df
+
+
+def generer_articles(rng, n):
+    return pd.DataFrame({
+        "article_id": identifiants(n),
+        "chapitre": rng.integers(1, 40, n),
+        "lettre_cle": rng.choice(list("ABCDEFGH"), n),
+        "unite_distribution": rng.integers(1, 10, n),
+        "direction": rng.choice(DIRECTIONS, n),
+        "classe_article": rng.choice(["STOCK", "HORS STOCK", "IMMOBILISATION"], n, p=[0.7, 0.25, 0.05]),
+        "designation": [f"ARTICLE {i:06d}" for i in range(n)],
+        "methode_reaprrovisionnement": rng.choice(["MIN-MAX", "PLANIFIE", "MANUEL"], n),
+        "article_organisation": rng.integers(1, 20, n),
+        "famille_article": rng.integers(1, 60, n),
+        "type_achat": rng.integers(1, 4, n),
+        "pu_annee_prec": rng.lognormal(6, 1.5, n).round(2),
+        "pu_annee_cours": rng.lognormal(6, 1.5, n).round(2),
+        "pu_dernier_cout_achat": rng.lognormal(6, 1.5, n).round(2),
+        "valeur_stock": rng.lognormal(9, 2, n).round(2),
+        "quantite_stock": rng.lognormal(3, 1.5, n).round(1),
+    })
+
+
+def generer_commandes(rng, n_commandes, articles, fournisseurs):
+    n_articles = len(articles)
+    # Lignes par commande : queue lourde (médiane ~10, maximum borné)
+    nb_lignes = np.clip(rng.lognormal(np.log(10), 1.4, n_commandes).astype(int), 1, 2000)
+    jours = (pd.Timestamp(f"{ANNEES[1]}-12-31") - pd.Timestamp(f"{ANNEES[0]}-01-01")).days
+    dates = pd.Timestamp(f"{ANNEES[0]}-01-01") + pd.to_timedelta(rng.integers(0, jours, n_commandes), unit="D")
+    # Saisonnalité : le mois est tiré selon POIDS_MOIS, l'année et le jour restent uniformes
+    mois = rng.choice(12, n_commandes, p=POIDS_MOIS / POIDS_MOIS.sum()) + 1
+    dates = pd.to_datetime({"year": dates.year, "month": mois, "day": np.minimum(dates.day, 28)})
+
+    commandes = pd.DataFrame({
+        "commande_id": np.arange(10_000, 10_000 + n_commandes),
+        "date_commande": dates,
+        "fournisseur_id": fournisseurs[zipf(rng, len(fournisseurs), n_commandes)].to_numpy(),
+        "libelle_article": [f"LIBELLE {i:03d}" for i in zipf(rng, LIBELLES, n_commandes, a=1.5)],
+        "type_achat": rng.choice(["D", "C"], n_commandes, p=[0.9999, 0.0001]),
+        "montant_commande": rng.lognormal(np.log(1.2e6), 1.3, n_commandes).round(1),
+        "montant_offre": np.where(rng.random(n_commandes) < 0.15, rng.lognormal(11, 1.5, n_commandes), 0).round(1),
+        "date": dates - pd.to_timedelta(rng.integers(0, 30, n_commandes), unit="D"),
+        "mode_paiement": rng.choice(MODES_PAIEMENT[0], n_commandes, p=MODES_PAIEMENT[1]),
+        "base_article": zipf(rng, n_articles, n_commandes, a=1.05),
+        "nb_lignes": nb_lignes,
+    })
+
+    # Une commande → ses lignes ; les articles d'une commande sont voisins et se répètent
+    lignes = commandes.loc[commandes.index.repeat(commandes["nb_lignes"])].reset_index(drop=True)
+    ecart = (rng.random(len(lignes)) * np.maximum(1, lignes["nb_lignes"] // 4)).astype(int)
+    lignes["article_id"] = articles.to_numpy()[(lignes["base_article"] + ecart) % n_articles]
+    lignes["quantite"] = rng.lognormal(np.log(60), 2, len(lignes)).round(1)
+    lignes["date_commande"] = lignes["date_commande"].dt.strftime("%Y-%m-%d")
+    lignes["date"] = lignes["date"].dt.strftime("%Y-%m-%d %H:%M:%S.000")
+    return lignes[ENTETE_COMMANDES]
+
+
+# 🤝 Couples fournisseur/article : ceux des commandes, plus un catalogue d'offres non commandées
+def generer_fournisseurs(rng, commandes, articles, fournisseurs):
+    vus = commandes[["fournisseur_id", "article_id"]].drop_duplicates()
+    n_extra = len(vus)
+    extra = pd.DataFrame({
+        "fournisseur_id": fournisseurs[zipf(rng, len(fournisseurs), n_extra)].to_numpy(),
+        "article_id": articles["article_id"].to_numpy()[rng.integers(0, len(articles), n_extra)],
+    })
+    couples = pd.concat([vus, extra]).drop_duplicates().reset_index(drop=True)
+    famille = articles.set_index("article_id")["famille_article"]
+    couples.insert(0, "famille_article", famille.reindex(couples["article_id"]).to_numpy())
+    return couples
+
+
+def generer_demandes(rng, n, articles):
+    return pd.DataFrame({
+        "dm_id": np.arange(1, n + 1),
+        "article_id": articles["article_id"].to_numpy()[zipf(rng, len(articles), n)],
+        "quantite": rng.lognormal(np.log(40), 1.8, n).round(1),
+        "direction": rng.choice(DIRECTIONS, n),
+    })
+
+
+# 📝 Écrit les quatre CSV dans « dossier » et renvoie {table: chemin}
+def generer(dossier, echelle=1, graine=0):
+    rng = np.random.default_rng(graine)
+    n = tailles(echelle)
+    os.makedirs(dossier, exist_ok=True)
+
+    articles = generer_articles(rng, n["articles"])
+    fournisseurs = identifiants(n["fournisseurs"], decalage=500_000).str[:7]
+    commandes = generer_commandes(rng, n["commandes"], articles["article_id"], fournisseurs)
+    frames = {
+        "articles": articles,
+        "commandes": commandes,
+        "fournisseurs": generer_fournisseurs(rng, commandes, articles, fournisseurs),
+        "demandes_matiere": generer_demandes(rng, n["demandes"], articles),
+    }
+    frames["commandes"] = salir(rng, frames["commandes"], ["quantite", "date_commande"],
+                                ["article_id", "fournisseur_id"])
+    frames["demandes_matiere"] = salir(rng, frames["demandes_matiere"], ["quantite"], ["article_id"])
+    frames["articles"] = invalider(rng, frames["articles"], positifs=["pu_annee_cours"], doublons=True)
+    frames["commandes"] = invalider(rng, frames["commandes"], obligatoires=["commande_id", "article_id"],
+                                    positifs=["quantite", "montant_commande"], numeriques=["montant_commande"],
+                                    references=["article_id", "fournisseur_id"])
+    frames["demandes_matiere"] = invalider(rng, frames["demandes_matiere"], obligatoires=["dm_id", "article_id"],
+                                           positifs=["quantite"], references=["article_id"], doublons=True)
+
+    chemins = {}
+    for nom, df in frames.items():
+        chemins[nom] = os.path.join(dossier, os.path.basename(TABLES[nom]["fichier"]))
+        df.to_csv(chemins[nom], index=False)
+    return chemins
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Génération de CSV synthétiques à l'échelle voulue")
+    parser.add_argument("--echelle", type=float, default=1, help="multiple de la taille actuelle de Commande.csv")
+    parser.add_argument("--dossier", default="data/synthetique")
+    parser.add_argument("--graine", type=int, default=0)
+    args = parser.parse_args()
+
+    for nom, chemin in generer(args.dossier, args.echelle, args.graine).items():
+        print(f"{nom:<20}{os.path.getsize(chemin) / 1_000_000:>10.1f} Mo  {chemin}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+# ▶️ Lancement depuis la racine du dépôt : python -m benchmarks.verif_fusion [--base oncf_verif] [--echelle 0.05]
+# 🔬 Vérification sur un vrai serveur MySQL de la fusion incrémentale d'ingest.py (--incremental) :
+# chargement complet de CSV synthétiques dans une base dédiée (--base, écrasée), puis deux passes
+# qui modifient Commande.csv (quantités changées, nouvelles commandes dont la moitié sans fournisseur)
+# et le rechargent en incrémental. Après chaque passe, chaque rollup rafraîchi doit être identique
+# à son agrégat recalculé depuis la table source, groupe NULL compris. Code de sortie 1 sinon.
+import argparse
+import sys
+
+import mysql.connector
+import numpy as np
+import pandas as pd
+
+import ingest
+import rollups
+from benchmarks import generer_donnees
+from benchmarks.bench_suite import fichiers_synthetiques
+from schema import TABLES
+
+TAUX_MODIFIEES = 0.01
+TAUX_NOUVELLES = 0.01
+
+
+def lire(cursor, sql):
+    cursor.execute(sql)
+    return pd.DataFrame(cursor.fetchall(), columns=cursor.column_names)
+
+
+# ✏️ Lignes modifiées et nouvelles commandes, écrites à la place du CSV commandes
+def modifier_commandes(chemin, rng):
+    df = pd.read_csv(chemin, dtype=str, keep_default_na=False)
+    modifiees = rng.random(len(df)) < TAUX_MODIFIEES
+    df.loc[modifiees, "quantite"] = (rng.lognormal(np.log(60), 2, modifiees.sum()).round(1) + 1).astype(str)
+    nouvelles = df.sample(frac=TAUX_NOUVELLES, random_state=rng.integers(1 << 31)).copy()
+    premier = pd.to_numeric(df["commande_id"], errors="coerce").max() + 1
+    nouvelles["commande_id"] = (premier + np.arange(len(nouvelles))).astype(int).astype(str)
+    nouvelles.iloc[::2, nouvelles.columns.get_loc("fournisseur_id")] = "null"
+    pd.concat([df, nouvelles]).to_csv(chemin, index=False)
+    return int(modifiees.sum()), len(nouvelles)
+
+
+# ⚖️ Groupes absents d'un côté ou mesures différentes entre le rollup servi et l'agrégat recalculé
+def ecarts(cursor, nom):
+    spec = rollups.ROLLUPS[nom]
+    groupes = [col for col, _, _ in spec["groupes"]]
+    mesures = [col for col, _, _ in spec["mesures"]]
+    servi = lire(cursor, f"SELECT * FROM {nom}")
+    attendu = lire(cursor, rollups.requete_agregat(nom))
+    comparaison = servi.merge(attendu, on=groupes, how="outer", suffixes=("", "_attendu"), indicator=True)
+    differents = comparaison["_merge"] != "both"
+    for col in mesures:
+        differents |= ~np.isclose(comparaison[col].astype("float64"), comparaison[f"{col}_attendu"].astype("float64"),
+                                  rtol=1e-9, equal_nan=True)
+    return int(differents.sum()), int(comparaison[groupes].isna().any(axis=1).sum())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rollups après fusion incrémentale contre recalcul complet (MySQL)")
+    parser.add_argument("--base", default="oncf_verif", help="base MySQL dédiée à la vérification (écrasée)")
+    parser.add_argument("--echelle", type=float, default=0.05)
+    parser.add_argument("--dossier", default="data/synthetique/verif_fusion")
+    parser.add_argument("--graine", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.graine)
+    chemins = generer_donnees.generer(args.dossier, args.echelle, args.graine)
+    config = {cle: valeur for cle, valeur in ingest.MYSQL_CONFIG.items() if cle != "database"}
+    conn = mysql.connector.connect(**config)
+    cursor = conn.cursor()
+    cursor.execute(f"DROP DATABASE IF EXISTS `{args.base}`")
+    cursor.execute(f"CREATE DATABASE `{args.base}`")
+    cursor.execute(f"USE `{args.base}`")
+    ingest.creer_table_watermarks(cursor)
+    ingest.creer_table_ingest_runs(cursor)
+
+    echecs = 0
+    with fichiers_synthetiques(chemins, args.dossier):
+        for nom in TABLES:
+            ingest.charger_table(conn, nom)
+        for passe in (1, 2):
+            modifiees, nouvelles = modifier_commandes(chemins["commandes"], rng)
+            resultat = ingest.charger_table(conn, "commandes", incremental=True)
+            print(f"\n=== Passe {passe} : {modifiees} ligne(s) modifiée(s), {nouvelles} nouvelle(s) "
+                  f"→ méthode {resultat['methode']}, {resultat['nouvelles']} insérée(s), "
+                  f"{resultat['modifiees']} mise(s) à jour ===")
+            for nom in rollups.rollups_de("commandes"):
+                differents, groupes_null = ecarts(cursor, nom)
+                echecs += differents
+                statut = "✅" if differents == 0 else "❌"
+                print(f"  {statut} {nom:<34}{differents:>6} groupe(s) en écart, {groupes_null} groupe(s) NULL")
+    cursor.close()
+    conn.close()
+    sys.exit(1 if echecs else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+# ⏱️ Instrumentation des dashboards : durée des requêtes, des blocs pandas et des graphiques
+# Activée par ONCF_CHRONO=1 ; sinon les chronomètres ne mesurent rien et ne coûtent presque rien.
+# Chaque exécution d'une page (rerun Streamlit) est une liste d'étapes, affichée dans la sidebar
+# et ajoutée en une ligne JSON au journal ONCF_CHRONO_LOG (logs/chrono.jsonl par défaut).
+import datetime
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+ACTIF = os.environ.get("ONCF_CHRONO", "") not in ("", "0")
+JOURNAL = os.environ.get("ONCF_CHRONO_LOG", "logs/chrono.jsonl")
+
+# Streamlit exécute chaque session dans son propre thread : un run en cours par thread
+_courant = threading.local()
+
+# 🖼️ Premier affichage du squelette de chaque page dans ce processus (horloge perf_counter),
+# pour la mesure du démarrage à froid (cf. benchmarks/bench_demarrage.py)
+premiers_rendus = {}
+
+
+def demarrer(page):
+    _courant.page = page
+    _courant.debut = time.perf_counter()
+    _courant.etapes = []
+    _courant.niveau = 0
+
+
+# Squelette de la page affiché (titre, sidebar) : l'étape indique le délai depuis le début du rerun
+def squelette_affiche():
+    maintenant = time.perf_counter()
+    premiers_rendus.setdefault(getattr(_courant, "page", None), maintenant)
+    if ACTIF and hasattr(_courant, "etapes"):
+        _courant.etapes.append({"etape": "squelette affiché", "categorie": "rendu", "niveau": _courant.niveau,
+                                "ms": (maintenant - _courant.debut) * 1000})
+
+
+@contextmanager
+def etape(nom, categorie="calcul"):
+    if not ACTIF or not hasattr(_courant, "etapes"):
+        yield
+        return
+    mesure = {"etape": nom, "categorie": categorie, "niveau": _courant.niveau, "ms": None}
+    _courant.etapes.append(mesure)
+    _courant.niveau += 1
+    debut = time.perf_counter()
+    try:
+        yield
+    finally:
+        mesure["ms"] = (time.perf_counter() - debut) * 1000
+        _courant.niveau -= 1
+
+
+def chronometre(categorie="calcul", nom=None):
+    def decorateur(fonction):
+        @functools.wraps(fonction)
+        def enveloppe(*args, **kwargs):
+            with etape(nom or fonction.__name__, categorie):
+                return fonction(*args, **kwargs)
+        return enveloppe
+    return decorateur
+
+
+# 📝 Clôt le run : une ligne JSON par rerun dans le journal
+def terminer():
+    if not ACTIF or not hasattr(_courant, "etapes"):
+        return []
+    _courant.total = (time.perf_counter() - _courant.debut) * 1000
+    os.makedirs(os.path.dirname(JOURNAL) or ".", exist_ok=True)
+    with open(JOURNAL, "a", encoding="utf-8") as f:
+        f.write(json.dumps({
+            "date": datetime.datetime.now().isoformat(timespec="milliseconds"),
+            "page": _courant.page,
+            "total_ms": round(_courant.total, 2),
+            "etapes": _courant.etapes,
+        }, ensure_ascii=False) + "\n")
+    return _courant.etapes
+
+
+# 📊 Panneau de la sidebar : durée de chaque étape du rerun, indentée selon l'imbrication
+def afficher_panneau(st, complements=None):
+    if not ACTIF:
+        return
+    mesures = terminer()
+    with st.sidebar.expander("⏱️ Temps par étape"):
+        st.dataframe([
+            {"étape": "· " * m["niveau"] + m["etape"], "catégorie": m["categorie"], "ms": round(m["ms"] or 0, 1)}
+            for m in mesures
+        ], hide_index=True)
+        st.caption(f"Rerun complet : {_courant.total:,.1f} ms — journal : {JOURNAL}")
+        if complements is not None:
+            complements()
@@ -1,21 +1,19 @@
 import streamlit as st
-import pandas as pd
-import mysql.connector
-
-# 🔹 Connexion MySQL (Docker)
-conn = mysql.connector.connect(
-    host="localhost",
-    user="oncf",
-    password="article",
-    database="articles_db",
-    port=3306
-)
-
-# 🔹 Récupération des données
-df = pd.read_sql("SELECT * FROM articles", conn)
-
-# 🔹 Titre principal
+
+import chrono
+from data_access import charger_table, enregistrer_prechauffage
+
+chrono.demarrer("dashboard.py")
+
+# 🔹 Titre principal, affiché avant la première lecture de données (squelette de la page)
 st.title("📊 Tableau de bord Achats")
+chrono.squelette_affiche()
+
+# 🔄 Articles rechargés en arrière-plan pour chaque nouvelle version, avant la bascule
+enregistrer_prechauffage("dashboard.py", lambda version: charger_table("articles"))
+
+# 🔹 Récupération des données (cache Parquet si à jour, sinon MySQL, cf. data_access.py)
+df = charger_table("articles")
 
 # 🔹 Affichage des données
 st.subheader("Aperçu des articles")
@@ -24,3 +22,6 @@ st.dataframe(df, use_container_width=True)
 # 🔹 KPI simple
 st.subheader("📦 Total des articles en stock")
 st.metric("Quantité totale", f"{df['quantite_stock'].sum():,.2f}")
+
+# ⏱️ Temps par étape du rerun (ONCF_CHRONO=1)
+chrono.afficher_panneau(st)
@@ -0,0 +1,240 @@
+# 🔌 Accès aux données partagé par les dashboards (test.py, analysis.py, dashboard.py)
+# Un seul engine poolé par processus et des résultats mis en cache par (SQL, paramètres, version).
+# À chaque bascule, les résultats antérieurs à la version précédente sont purgés, et chaque page
+# peut vider ses propres caches (cf. enregistrer_bascule).
+# La version servie ne change qu'après préchauffage : un thread d'arrière-plan surveille ingest_runs,
+# recharge les données des pages pour la nouvelle version pendant que l'ancienne reste servie,
+# puis bascule d'un coup. Aucune requête d'utilisateur n'attend le rechargement complet.
+# Il n'y a pas d'invalidation explicite : ingest.py ne fait qu'ajouter une ligne à ingest_runs, et
+# ce sondage (toutes les INTERVALLE_RAFRAICHISSEMENT secondes) est le seul mécanisme de fraîcheur.
+# Les tables nettoyées sont lues dans le cache Parquet quand il est à jour, sinon dans MySQL.
+# Tous les résultats reçoivent le plan de types compacts de dtypes.py.
+import collections
+import re
+import threading
+import time
+
+import streamlit as st
+
+import chrono
+import dtypes
+import paresseux
+import parquet_cache
+from connexion import creer_engine
+from schema import TABLES
+
+pd = paresseux.module("pandas")
+sqlalchemy = paresseux.module("sqlalchemy")
+
+# 🔄 Fréquence de vérification d'un nouveau chargement, et nombre de résultats gardés en cache
+# (pas de durée de vie : une entrée n'est périmée que par un changement de version, puis purgée)
+INTERVALLE_RAFRAICHISSEMENT = 30
+MAX_RESULTATS = 1000
+
+
+# Un engine par processus Streamlit (cf. connexion.py)
+@st.cache_resource
+def get_engine():
+    return creer_engine()
+
+
+# 🏷️ Version des données : dernier chargement enregistré par ingest.py (run_id, strictement
+# croissant, là où termine_le ne distingue pas deux chargements dans la même seconde)
+def lire_version():
+    try:
+        with get_engine().connect() as conn:
+            return str(conn.execute(sqlalchemy.text("SELECT MAX(run_id) FROM ingest_runs")).scalar())
+    except sqlalchemy.exc.SQLAlchemyError:
+        return None
+
+
+# 🗃️ Résultats par génération (version des données, ou empreinte du CSV d'une table) :
+# contrairement à st.cache_data, les générations périmées se purgent sans vider tout le cache
+class CacheGenerations:
+    def __init__(self, max_entrees):
+        self.max_entrees = max_entrees
+        self.entrees = collections.OrderedDict()
+        self.verrou = threading.Lock()
+
+    # Copie renvoyée, comme st.cache_data : un appelant qui modifie son DataFrame ne touche pas au cache
+    def lire(self, generation, cle, calculer):
+        with self.verrou:
+            resultat = self.entrees.get((generation, cle))
+            if resultat is not None:
+                self.entrees.move_to_end((generation, cle))
+        if resultat is None:
+            resultat = calculer()
+            with self.verrou:
+                self.entrees[(generation, cle)] = resultat
+                while len(self.entrees) > self.max_entrees:
+                    self.entrees.popitem(last=False)
+        return resultat.copy()
+
+    def purger(self, garder):
+        with self.verrou:
+            for cle in [cle for cle in self.entrees if cle[0] not in garder]:
+                del self.entrees[cle]
+
+
+_resultats = CacheGenerations(MAX_RESULTATS)
+
+
+# 🔄 Rafraîchissement en arrière-plan
+_etat = {"initialise": False, "version": None, "rafraichi_le": None, "en_cours": False}
+_verrou = threading.Lock()
+_thread = None
+# Version forcée pour le thread de préchauffage (les autres threads lisent la version servie)
+_local = threading.local()
+# Fonctions « prechauffer(version) » enregistrées par chaque page
+_prechauffages = {}
+# Fonctions « basculer(version) » appelées juste après la bascule (caches propres à une page)
+_bascules = {}
+
+
+def enregistrer_prechauffage(page, fonction):
+    _prechauffages[page] = fonction
+
+
+def enregistrer_bascule(page, fonction):
+    _bascules[page] = fonction
+
+
+def rafraichir(version):
+    _etat["en_cours"] = True
+    _local.version = version
+    try:
+        for page, prechauffer in list(_prechauffages.items()):
+            try:
+                prechauffer(version)
+            except Exception as e:  # une page en erreur ne bloque pas la bascule des autres
+                print(f"⚠️ Préchauffage de {page} pour la version {version} : {e}")
+    finally:
+        del _local.version
+        _etat["en_cours"] = False
+    # Bascule atomique : une seule affectation, les reruns suivants lisent la nouvelle version
+    precedente = _etat["version"]
+    _etat["version"] = version
+    _etat["rafraichi_le"] = time.time()
+    # Les reruns en cours peuvent encore lire la version précédente : seules les plus anciennes partent
+    garder = {precedente, version}
+    garder |= set(empreintes_sources(precedente).values()) | set(empreintes_sources(version).values())
+    _resultats.purger(garder)
+    for page, basculer in list(_bascules.items()):
+        try:
+            basculer(version)
+        except Exception as e:
+            print(f"⚠️ Bascule de {page} vers la version {version} : {e}")
+
+
+def _surveiller():
+    while True:
+        time.sleep(INTERVALLE_RAFRAICHISSEMENT)
+        version = lire_version()
+        if version is not None and version != _etat["version"]:
+            rafraichir(version)
+
+
+def demarrer_rafraichissement():
+    global _thread
+    with _verrou:
+        if _thread is None:
+            _thread = threading.Thread(target=_surveiller, name="oncf-rafraichissement", daemon=True)
+            _thread.start()
+
+
+def etat_rafraichissement():
+    return dict(_etat)
+
+
+# 🏷️ Version servie : la première lecture est synchrone (cache vide), les suivantes suivent le thread
+def version_donnees():
+    version = getattr(_local, "version", None)
+    if version is not None:
+        return version
+    if not _etat["initialise"]:
+        with _verrou:
+            if not _etat["initialise"]:
+                _etat["version"] = lire_version()
+                _etat["rafraichi_le"] = time.time()
+                _etat["initialise"] = True
+        demarrer_rafraichissement()
+    return _etat["version"]
+
+
+def _lire_en_cache(sql, params, version):
+    return _resultats.lire(version, ("sql", sql, params), lambda: dtypes.appliquer(
+        pd.read_sql(sqlalchemy.text(sql), get_engine(), params=dict(params))
+    ))
+
+
+# 🏷️ Nom court d'une requête pour l'instrumentation : sa première table lue
+def libelle_sql(sql):
+    table = re.search(r"\bFROM\s+(\w+)", sql, re.IGNORECASE)
+    return f"SQL {table.group(1) if table else sql.split()[0]}"
+
+
+# 📥 Exécute une requête ; la version servie fait partie de la clé
+def run_query(sql, params=None):
+    with chrono.etape(libelle_sql(sql), "requête"):
+        return _lire_en_cache(sql, tuple(sorted((params or {}).items())), version_donnees())
+
+
+# 🔏 Empreinte sha256 du dernier CSV chargé, par fichier source (cf. ingest_watermarks),
+# lue une fois par version pour basculer avec elle
+@st.cache_data(max_entries=8, show_spinner=False)
+def empreintes_sources(version):
+    try:
+        with get_engine().connect() as conn:
+            return dict(conn.execute(sqlalchemy.text("SELECT fichier, sha256 FROM ingest_watermarks")).fetchall())
+    except sqlalchemy.exc.SQLAlchemyError:
+        return {}
+
+
+# Années en plages de dates (date >= :debut AND date < :fin) plutôt que YEAR(date) : l'index sur la
+# colonne date reste utilisable, comme dans queries.clause_filtres
+def lire_table_mysql(nom, colonnes=None, annees=None, fournisseur=None):
+    selection = ", ".join(f"`{col}`" for col in colonnes) if colonnes else "*"
+    conditions, params = [], {}
+    if annees:
+        colonne_date = TABLES[nom]["colonne_date"]
+        plages = []
+        for i, annee in enumerate(annees):
+            plages.append(f"(`{colonne_date}` >= :debut_{i} AND `{colonne_date}` < :fin_{i})")
+            params[f"debut_{i}"] = f"{int(annee)}-01-01"
+            params[f"fin_{i}"] = f"{int(annee) + 1}-01-01"
+        conditions.append(f"({' OR '.join(plages)})")
+    if fournisseur:
+        conditions.append("fournisseur_id = :fournisseur")
+        params["fournisseur"] = fournisseur
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    df = pd.read_sql(sqlalchemy.text(f"SELECT {selection} FROM {nom} {where}"), get_engine(), params=params)
+    return parquet_cache.typer(df)
+
+
+def _charger(nom, colonnes, annees, fournisseur, empreinte):
+    colonnes = list(colonnes) if colonnes else None
+    df = parquet_cache.lire(nom, colonnes, annees, empreinte, fournisseur=fournisseur) if empreinte else None
+    if df is None:
+        df = lire_table_mysql(nom, colonnes, annees, fournisseur)
+    return dtypes.appliquer(df)
+
+
+# Une table dont le CSV n'a pas changé reste en cache d'une version à l'autre (génération = empreinte)
+def _charger_en_cache(nom, colonnes, annees, fournisseur, empreinte, version):
+    return _resultats.lire(empreinte or version, ("table", nom, colonnes, annees, fournisseur),
+                           lambda: _charger(nom, colonnes, annees, fournisseur, empreinte))
+
+
+# 📦 Table nettoyée, limitée aux colonnes, années et fournisseur demandés (Parquet si à jour, sinon MySQL)
+def charger_table(nom, colonnes=None, annees=None, fournisseur=None):
+    version = version_donnees()
+    empreinte = empreintes_sources(version).get(TABLES[nom]["fichier"])
+    with chrono.etape(f"table {nom}", "requête"):
+        return _charger_en_cache(
+            nom,
+            tuple(colonnes) if colonnes else None,
+            tuple(int(a) for a in annees) if annees else None,
+            fournisseur,
+            empreinte,
+            version
+        )
@@ -0,0 +1,70 @@
+# 🧬 Plan de types compacts appliqué aux DataFrames des dashboards dès leur chargement
+import paresseux
+
+pd = paresseux.module("pandas")
+
+# Identifiants et libellés répétés → category ; années et compteurs → Int32 (nullable) ;
+# quantités par ligne → float32 (MySQL les stocke déjà en FLOAT simple précision, rien n'est perdu).
+# Les montants et toutes les sommes restent en float64 : affichés au centime et cumulés jusqu'à ~1e12 MAD,
+# ils dépasseraient les 7 chiffres significatifs du float32. Les requêtes nomment donc leurs sommes
+# autrement que la colonne (ex. SUM(quantite) AS quantite_totale).
+PLAN_DTYPES = {
+    "article_id": "category",
+    "fournisseur_id": "category",
+    "fournisseur_fk": "category",
+    "designation": "category",
+    "libelle_article": "category",
+    "type_achat": "category",
+    "mode_paiement": "category",
+    "commande_id": "Int32",
+    "annee": "Int32",
+    "famille_article": "Int32",
+    "nb_lignes": "Int32",
+    "nb_dm": "Int32",
+    "nb_fournisseurs": "Int32",
+    "quantite": "float32",
+    "date_commande": "datetime64[ns]",
+    "date": "datetime64[ns]",
+}
+
+
+def appliquer(df):
+    for col, dtype in PLAN_DTYPES.items():
+        if col not in df.columns or str(df[col].dtype) == dtype:
+            continue
+        if dtype.startswith("datetime64"):
+            if not pd.api.types.is_datetime64_any_dtype(df[col]):
+                df[col] = pd.to_datetime(df[col], errors="coerce")
+        elif dtype == "category":
+            df[col] = df[col].astype("category")
+        else:
+            df[col] = pd.to_numeric(df[col], errors="coerce").astype(dtype)
+    return df
+
+
+def memoire_mo(df):
+    return df.memory_usage(deep=True).sum() / 1_000_000
+
+
+# 📏 Rapport mémoire avant/après plan de types, pour dimensionner le serveur
+def rapport_memoire(frames):
+    lignes = []
+    for nom, df in frames.items():
+        avant = memoire_mo(df)
+        apres = memoire_mo(appliquer(df.copy()))
+        lignes.append({
+            "frame": nom,
+            "lignes": len(df),
+            "avant_mo": avant,
+            "apres_mo": apres,
+            "gain_pct": (1 - apres / avant) * 100 if avant else 0.0,
+        })
+    rapport = pd.DataFrame(lignes)
+    total = {
+        "frame": "TOTAL",
+        "lignes": rapport["lignes"].sum(),
+        "avant_mo": rapport["avant_mo"].sum(),
+        "apres_mo": rapport["apres_mo"].sum(),
+    }
+    total["gain_pct"] = (1 - total["apres_mo"] / total["avant_mo"]) * 100 if total["avant_mo"] else 0.0
+    return pd.concat([rapport, pd.DataFrame([total])], ignore_index=True)
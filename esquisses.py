@@ -0,0 +1,279 @@
+# ▶️ Vérification : python esquisses.py [--annees 2019 2020] — compare esquisses et mode exact
+# 🧬 Esquisses mergeables par mois de commande, optionnelles (ONCF_ESQUISSES=1, ou ingest.py --esquisses)
+# HyperLogLog : nombre de fournisseurs distincts par article ; Count-Min : montant par fournisseur
+# et par article ; Candidats : plus gros totaux de chaque mois, parmi lesquels chercher les tops.
+# Activées, elles ne servent que les KPIs fournisseurs et le top 5 de tout l'historique sans filtre
+# (cf. kpis.py) : la fusion de tous les mois (max des registres, somme des compteurs) évite de relire
+# le rollup le plus fin. Tout KPI filtré par année ou fournisseur reste exact.
+# La fusion d'une seule année ne sert qu'à la vérification ci-dessus.
+# Le mode exact (Exacte) a la même interface sur des agrégats complets, pour vérifier les approximations.
+import argparse
+import os
+import pickle
+import time
+
+import paresseux
+
+np = paresseux.module("numpy")
+pd = paresseux.module("pandas")
+
+# Même interrupteur pour la construction à l'ingestion et la lecture par les dashboards
+ACTIVEES = os.environ.get("ONCF_ESQUISSES", "0") not in ("", "0")
+DOSSIER = "data/esquisses"
+FICHIER = "esquisses.pkl"
+
+# 64 registres par article : erreur type 1,04/√64 ≈ 13 %, mais le comptage linéaire utilisé
+# pour les petites cardinalités (quelques fournisseurs par article) est quasi exact
+PRECISION_HLL = 6
+LARGEUR_CM = 1024
+PROFONDEUR_CM = 4
+CAPACITE_TOPK = 64
+
+# 🔑 Une clé de hachage (16 caractères) par ligne du Count-Min, la première sert au HyperLogLog
+CLES_HACHAGE = [f"oncf-esquisse-{i:02d}" for i in range(PROFONDEUR_CM)]
+
+
+def hacher(valeurs, ligne=0):
+    return pd.util.hash_array(np.asarray(valeurs, dtype=object), hash_key=CLES_HACHAGE[ligne], categorize=True)
+
+
+# 🔢 Registres HyperLogLog d'un ensemble de groupes (une ligne par article)
+class HyperLogLog:
+    def __init__(self, cles, registres, precision=PRECISION_HLL):
+        self.cles = pd.Index(cles)
+        self.registres = registres
+        self.precision = precision
+
+    @classmethod
+    def construire(cls, groupes, valeurs, precision=PRECISION_HLL):
+        # Comme COUNT(DISTINCT), une valeur NULL n'est pas comptée ; son groupe garde des registres vides
+        codes, cles = pd.factorize(np.asarray(groupes))
+        presents = pd.notna(np.asarray(valeurs, dtype=object))
+        codes = codes[presents]
+        hachage = hacher(np.asarray(valeurs, dtype=object)[presents])
+        bits = 64 - precision
+        indices = (hachage >> np.uint64(bits)).astype(np.int64)
+        reste = (hachage & np.uint64((1 << bits) - 1)).astype("float64")
+        # Rang du premier bit à 1 parmi les « bits » restants (bits + 1 si tous nuls)
+        rangs = np.where(reste > 0, bits - np.floor(np.log2(np.maximum(reste, 1))), bits + 1).astype(np.uint8)
+        registres = np.zeros((len(cles), 1 << precision), dtype=np.uint8)
+        np.maximum.at(registres, (codes, indices), rangs)
+        return cls(cles, registres, precision)
+
+    @classmethod
+    def fusionner(cls, esquisses):
+        codes, cles = pd.factorize(np.concatenate([e.cles.to_numpy() for e in esquisses]))
+        registres = np.zeros((len(cles), 1 << esquisses[0].precision), dtype=np.uint8)
+        np.maximum.at(registres, codes, np.concatenate([e.registres for e in esquisses]))
+        return cls(cles, registres, esquisses[0].precision)
+
+    def estimer(self):
+        m = self.registres.shape[1]
+        alpha = {16: 0.673, 32: 0.697, 64: 0.709}.get(m, 0.7213 / (1 + 1.079 / m))
+        brute = alpha * m * m / np.power(2.0, -self.registres.astype("float64")).sum(axis=1)
+        vides = (self.registres == 0).sum(axis=1)
+        with np.errstate(divide="ignore"):
+            lineaire = m * np.log(m / np.maximum(vides, 1))
+        return pd.Series(np.where((brute <= 2.5 * m) & (vides > 0), lineaire, brute), index=self.cles)
+
+
+# 📊 Count-Min : somme des poids par clé, surestimée au pire de ε·total (ε = e / largeur)
+class CountMin:
+    def __init__(self, table):
+        self.table = table
+
+    @classmethod
+    def construire(cls, cles, poids, largeur=LARGEUR_CM, profondeur=PROFONDEUR_CM):
+        table = np.zeros((profondeur, largeur))
+        for ligne in range(profondeur):
+            np.add.at(table[ligne], hacher(cles, ligne) % np.uint64(largeur), poids)
+        return cls(table)
+
+    @classmethod
+    def fusionner(cls, esquisses):
+        return cls(sum(e.table for e in esquisses))
+
+    def estimer(self, cles):
+        largeur = np.uint64(self.table.shape[1])
+        return np.min([
+            self.table[ligne][hacher(cles, ligne) % largeur] for ligne in range(self.table.shape[0])
+        ], axis=0)
+
+
+# 🏅 Candidats des tops : les « capacite » plus gros totaux exacts de chaque mois, réunis à la fusion.
+# Ce n'est pas un Space-Saving : une clé hors du top d'un mois y compte pour 0, les totaux fusionnés
+# ne sont que des minorants. Seule la liste des candidats sert, les montants viennent du Count-Min.
+class Candidats:
+    def __init__(self, compteurs):
+        self.compteurs = compteurs
+
+    @classmethod
+    def construire(cls, cles, poids, capacite=CAPACITE_TOPK):
+        return cls(pd.Series(poids, index=cles).groupby(level=0).sum().nlargest(capacite))
+
+    @classmethod
+    def fusionner(cls, esquisses, capacite=CAPACITE_TOPK):
+        return cls(pd.concat([e.compteurs for e in esquisses]).groupby(level=0).sum().nlargest(capacite))
+
+    def candidats(self):
+        return self.compteurs.index
+
+
+def top(candidats, count_min, n, colonne, valeur):
+    estimations = pd.Series(count_min.estimer(candidats.to_numpy()), index=candidats)
+    return estimations.nlargest(n).rename_axis(colonne).reset_index(name=valeur)
+
+
+# 🧬 Esquisses d'un mois (ou d'une fusion de mois)
+class Esquisse:
+    def __init__(self, fournisseurs_par_article, montants_fournisseurs, candidats_fournisseurs,
+                 montants_articles, candidats_articles):
+        self.fournisseurs_par_article = fournisseurs_par_article
+        self.montants_fournisseurs = montants_fournisseurs
+        self.candidats_fournisseurs = candidats_fournisseurs
+        self.montants_articles = montants_articles
+        self.candidats_articles = candidats_articles
+
+    @classmethod
+    def construire(cls, df):
+        montants = df["montant_commande"].to_numpy(dtype="float64")
+        return cls(
+            HyperLogLog.construire(df["article_id"], df["fournisseur_id"]),
+            CountMin.construire(df["fournisseur_id"], montants),
+            Candidats.construire(df["fournisseur_id"].to_numpy(), montants),
+            CountMin.construire(df["article_id"], montants),
+            Candidats.construire(df["article_id"].to_numpy(), montants),
+        )
+
+    @classmethod
+    def fusionner(cls, esquisses):
+        return cls(
+            HyperLogLog.fusionner([e.fournisseurs_par_article for e in esquisses]),
+            CountMin.fusionner([e.montants_fournisseurs for e in esquisses]),
+            Candidats.fusionner([e.candidats_fournisseurs for e in esquisses]),
+            CountMin.fusionner([e.montants_articles for e in esquisses]),
+            Candidats.fusionner([e.candidats_articles for e in esquisses]),
+        )
+
+    def nb_fournisseurs_par_article(self):
+        return self.fournisseurs_par_article.estimer()
+
+    def top_fournisseurs(self, n=5):
+        return top(self.candidats_fournisseurs.candidats(), self.montants_fournisseurs, n,
+                   "fournisseur_id", "montant_commande")
+
+    def top_articles(self, n=10):
+        return top(self.candidats_articles.candidats(), self.montants_articles, n,
+                   "article_id", "montant_commande")
+
+
+# ✅ Mode exact : mêmes fusions et mêmes réponses, sur les lignes (article, fournisseur, montant)
+class Exacte:
+    def __init__(self, df):
+        self.df = df
+
+    @classmethod
+    def construire(cls, df):
+        return cls(df[["article_id", "fournisseur_id", "montant_commande"]])
+
+    @classmethod
+    def fusionner(cls, esquisses):
+        return cls(pd.concat([e.df for e in esquisses], ignore_index=True))
+
+    def nb_fournisseurs_par_article(self):
+        return self.df.groupby("article_id")["fournisseur_id"].nunique().astype("float64")
+
+    def top_fournisseurs(self, n=5):
+        return self.df.groupby("fournisseur_id")["montant_commande"].sum().nlargest(n).reset_index()
+
+    def top_articles(self, n=10):
+        return self.df.groupby("article_id")["montant_commande"].sum().nlargest(n).reset_index()
+
+
+# 📅 Une esquisse par mois « AAAA-MM », à partir des lignes de rollup_article_fournisseur_mois
+def construire(df, exact=False):
+    classe = Exacte if exact else Esquisse
+    mois = pd.to_datetime(df["mois"], errors="coerce").dt.strftime("%Y-%m")
+    return {m: classe.construire(groupe) for m, groupe in df[mois.notna()].groupby(mois[mois.notna()])}
+
+
+# 🔀 Fusion des mois d'une année (toutes les années si None) ; None si aucun mois
+def fusionner(par_mois, annee=None):
+    selection = [e for m, e in par_mois.items() if annee is None or m.startswith(f"{int(annee)}-")]
+    if not selection:
+        return None
+    return type(selection[0]).fusionner(selection)
+
+
+def indicateurs_fournisseurs(fusion):
+    nb = fusion.nb_fournisseurs_par_article().round()
+    return {"moy_fournisseurs": nb.mean(), "pct_multi_fournisseurs": (nb > 1).mean() * 100}
+
+
+# 💾 Publication atomique, avec l'empreinte du CSV commandes chargé (cf. ingest_watermarks)
+def enregistrer(par_mois, empreinte, dossier=DOSSIER):
+    os.makedirs(dossier, exist_ok=True)
+    chemin = os.path.join(dossier, FICHIER)
+    with open(chemin + ".tmp", "wb") as f:
+        pickle.dump({"empreinte": empreinte, "mois": par_mois}, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(chemin + ".tmp", chemin)
+
+
+# 📖 Esquisses par mois ; None si absentes, illisibles (classes d'une version antérieure de ce module)
+# ou construites pour un autre chargement
+def lire(empreinte=None, dossier=DOSSIER):
+    try:
+        with open(os.path.join(dossier, FICHIER), "rb") as f:
+            contenu = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+        return None
+    if empreinte is not None and contenu["empreinte"] != empreinte:
+        return None
+    return contenu["mois"]
+
+
+# 🔬 Écarts entre esquisses et mode exact, par année, sur les lignes du rollup
+def verifier(df, annees=None):
+    approchees, exactes = construire(df), construire(df, exact=True)
+    resultats = []
+    for annee in annees or [None]:
+        debut = time.perf_counter()
+        fusion = fusionner(approchees, annee)
+        kpi = indicateurs_fournisseurs(fusion)
+        top_f, top_a = fusion.top_fournisseurs(), fusion.top_articles()
+        duree = time.perf_counter() - debut
+        debut = time.perf_counter()
+        reference = fusionner(exactes, annee)
+        kpi_exact = indicateurs_fournisseurs(reference)
+        top_f_exact, top_a_exact = reference.top_fournisseurs(), reference.top_articles()
+        duree_exacte = time.perf_counter() - debut
+        resultats.append({
+            "annee": annee or "toutes",
+            "moy_fournisseurs": kpi["moy_fournisseurs"],
+            "moy_fournisseurs_exact": kpi_exact["moy_fournisseurs"],
+            "pct_multi": kpi["pct_multi_fournisseurs"],
+            "pct_multi_exact": kpi_exact["pct_multi_fournisseurs"],
+            "top5_fournisseurs_communs": len(set(top_f["fournisseur_id"]) & set(top_f_exact["fournisseur_id"])),
+            "top10_articles_communs": len(set(top_a["article_id"]) & set(top_a_exact["article_id"])),
+            "ms_esquisses": duree * 1000,
+            "ms_exact": duree_exacte * 1000,
+        })
+    return pd.DataFrame(resultats)
+
+
+def main():
+    from sqlalchemy import text
+
+    from connexion import creer_engine
+
+    parser = argparse.ArgumentParser(description="Écarts entre esquisses et KPIs exacts")
+    parser.add_argument("--annees", type=int, nargs="*", help="années à vérifier (défaut : tout l'historique)")
+    args = parser.parse_args()
+    df = pd.read_sql(text(
+        "SELECT article_id, fournisseur_id, mois, montant_commande FROM rollup_article_fournisseur_mois"
+    ), creer_engine())
+    print(verifier(df, args.annees).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+# 📊 Graphiques Plotly du dashboard test.py, mémoïsés avec la même clé que kpis.py
+# Un rerun sans changement de filtre réutilise la figure déjà construite ; vider() comme kpis.py.
+from functools import lru_cache
+
+import chrono
+import kpis
+import paresseux
+from kpis import TAILLE_CACHE, TAILLE_CACHE_ARTICLE
+
+px = paresseux.module("plotly.express")
+go = paresseux.module("plotly.graph_objects")
+
+
+@lru_cache(maxsize=TAILLE_CACHE)
+@chrono.chronometre("graphique")
+def top_fournisseurs(lire, version, annee, fournisseur):
+    return px.bar(
+        kpis.top_fournisseurs(lire, version, annee, fournisseur),
+        x='fournisseur_id',
+        y='montant_commande',
+        labels={'fournisseur_id': 'Fournisseur', 'montant_commande': 'Montant commandé (MAD)'},
+        color='montant_commande',
+        color_continuous_scale='Viridis'
+    )
+
+
+@lru_cache(maxsize=TAILLE_CACHE)
+@chrono.chronometre("graphique")
+def quantites_mensuelles(lire, version, annee, fournisseur):
+    return px.line(
+        kpis.quantites_mensuelles(lire, version, annee, fournisseur),
+        x='mois',
+        y='quantite_totale',
+        markers=True,
+        labels={'mois': 'Mois', 'quantite_totale': 'Quantité commandée'}
+    )
+
+
+@lru_cache(maxsize=TAILLE_CACHE_ARTICLE)
+@chrono.chronometre("graphique")
+def detail_article(lire, version, annee, fournisseur, designation):
+    data_annee = kpis.detail_article(lire, version, annee, fournisseur, designation)
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        x=data_annee['annee'],
+        y=data_annee['montant_annuel_payé'] / 1_000,
+        name="Montant payé (K MAD)",
+        marker_color='indianred'
+    ))
+    fig.add_trace(go.Scatter(
+        x=data_annee['annee'],
+        y=data_annee['quantite_commandee_annuelle'],
+        name="Quantité commandée",
+        mode='lines+markers',
+        yaxis="y2"
+    ))
+    fig.update_layout(
+        title=f"📈 Évolution annuelle pour l'article : {designation}",
+        yaxis=dict(title="Montant (K MAD)"),
+        yaxis2=dict(title="Quantité", overlaying="y", side="right"),
+        xaxis=dict(title="Année")
+    )
+    return fig
+
+
+@lru_cache(maxsize=TAILLE_CACHE)
+@chrono.chronometre("graphique")
+def top_articles(lire, version, annee, fournisseur):
+    top5 = kpis.articles_commandes(lire, version, annee, fournisseur).head(5).copy()
+    top5['montant_kMAD'] = top5['montant_total_payé'] / 1_000
+    fig = px.bar(
+        top5,
+        x='designation',
+        y='montant_kMAD',
+        text='montant_kMAD',
+        labels={'designation': 'Article', 'montant_kMAD': 'Montant (K MAD)'},
+        color='montant_kMAD',
+    )
+    fig.update_traces(texttemplate='%{text:.1f}K', textposition='outside')
+    fig.update_layout(
+        uniformtext_minsize=8,
+        uniformtext_mode='hide',
+        yaxis=dict(
+            title="Montant (K MAD)",
+            type='log',
+            autorange=True
+        )
+    )
+    return fig
+
+
+@lru_cache(maxsize=TAILLE_CACHE)
+@chrono.chronometre("graphique")
+def surstock(lire, version, annee, fournisseur):
+    return px.bar(
+        kpis.top_surstock(lire, version, annee, fournisseur),
+        x='designation',
+        y='ecart_dm_stock',
+        labels={'designation': 'Article', 'ecart_dm_stock': 'Surstock'},
+        color_discrete_sequence=['#1f77b4']
+    )
+
+
+@lru_cache(maxsize=TAILLE_CACHE)
+@chrono.chronometre("graphique")
+def sousstock(lire, version, annee, fournisseur):
+    return px.bar(
+        kpis.top_sousstock(lire, version, annee, fournisseur),
+        x='designation',
+        y='ecart_dm_stock',
+        labels={'designation': 'Article', 'ecart_dm_stock': 'Sous-stock'},
+        color_discrete_sequence=['#d62728']
+    )
+
+
+@lru_cache(maxsize=TAILLE_CACHE)
+@chrono.chronometre("graphique")
+def montant_par_annee(lire, version, annee, fournisseur):
+    df = kpis.montant_par_annee(lire, version, annee, fournisseur)
+    fig = px.line(
+        df,
+        x='annee',
+        y=df['montant_commande'] / 1_000_000,
+        markers=True,
+        labels={'annee': 'Année', 'y': 'Montant (M MAD)'}
+    )
+    fig.update_traces(texttemplate='%{y:.1f}M')
+    return fig
+
+
+SECTIONS = [
+    top_fournisseurs, quantites_mensuelles, detail_article, top_articles, surstock, sousstock, montant_par_annee,
+]
+
+
+def vider():
+    for f in SECTIONS:
+        f.cache_clear()
@@ -0,0 +1,18 @@
+# 🗂️ Index de drill-down : un DataFrame trié une fois par clé, puis chaque groupe lu par tranche
+# Remplace les masques booléens « df[df[cle] == valeur] » (un parcours complet par interaction)
+# par une recherche dans un dict et un iloc[debut:fin] sur des lignes contiguës.
+class IndexGroupes:
+    def __init__(self, df, cle, tri=None):
+        self.cle = cle
+        self.df = df.sort_values([cle] + list(tri or []), kind="stable").reset_index(drop=True)
+        # Après le tri, les positions d'un groupe sont contiguës : on ne garde que leurs bornes
+        self.bornes = {
+            valeur: (int(positions[0]), int(positions[-1]) + 1)
+            for valeur, positions in self.df.groupby(cle, observed=True, sort=False).indices.items()
+        }
+        # 📋 Valeurs triées, prêtes pour un selectbox
+        self.cles = sorted(self.bornes)
+
+    def lignes(self, valeur):
+        debut, fin = self.bornes.get(valeur, (0, 0))
+        return self.df.iloc[debut:fin]
@@ -1,15 +1,45 @@
+import argparse
+import datetime
+import hashlib
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
 import pandas as pd
-import mysql.connector
+
+import anomalies
+import esquisses
+import paresseux
+import parquet_cache
+import rollups
+import validation
+from schema import (SUFFIXE_STAGING, TABLES, ajouter_index, colonnes_existantes, colonnes_table,
+                    creer_table, echanger_ensemble, echanger_tables, table_existe)
+
+# 🐬 Pilote MySQL importé au premier usage : la préparation des CSV (morceaux_prepares) sert aussi
+# sans serveur, cf. benchmarks/bench_suite.py --moteur sqlite
+connecteur = paresseux.module("mysql.connector")
+pooling = paresseux.module("mysql.connector.pooling")
 
 # 📌 Connexion à MySQL (à adapter si besoin)
-conn = mysql.connector.connect(
+MYSQL_CONFIG = dict(
     host="localhost",
     user="oncf",
     password="oncf",
     database="oncf",
-    port=3306
+    port=3306,
+    allow_local_infile=True,
+    buffered=True
 )
-cursor = conn.cursor()
+
+# 📦 Taille par défaut des lots envoyés avec executemany
+CHUNK_SIZE = 5000
+
+# 📖 Nombre de lignes lues à la fois dans chaque CSV (borne la mémoire utilisée)
+READ_CHUNK_SIZE = 50000
+
 
 # 🔁 Nettoyage commun
 def clean_df(df):
@@ -17,109 +47,556 @@ def clean_df(df):
     df.fillna(value=pd.NA, inplace=True)
     return df
 
-# ✅ ARTICLES
-df_articles = pd.read_csv("data/Article.csv")
-df_articles = clean_df(df_articles)
-
-cursor.execute("DROP TABLE IF EXISTS articles")
-cursor.execute("""
-CREATE TABLE articles (
-    article_id VARCHAR(20),
-    chapitre INT,
-    lettre_cle VARCHAR(5),
-    unite_distribution INT,
-    direction VARCHAR(50),
-    classe_article VARCHAR(50),
-    designation VARCHAR(100),
-    methode_reaprrovisionnement VARCHAR(50),
-    article_organisation INT,
-    famille_article INT,
-    type_achat INT,
-    pu_annee_prec FLOAT,
-    pu_annee_cours FLOAT,
-    pu_dernier_cout_achat FLOAT,
-    valeur_stock FLOAT,
-    quantite_stock FLOAT
-)
-""")
-
-insert_article = "INSERT INTO articles VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)"
-for _, row in df_articles.iterrows():
-    cursor.execute(insert_article, tuple(row))
-# ✅ COMMANDES
-df_cmd = pd.read_csv("data/Commande.csv")
-df_cmd = clean_df(df_cmd)
-
-# 🕒 Conversion intelligente des dates (si invalide → None)
-df_cmd["date_commande"] = pd.to_datetime(df_cmd["date_commande"], errors="coerce")
-df_cmd["date"] = pd.to_datetime(df_cmd["date"], errors="coerce")
-
-# ⛑ Remplace les dates invalides (NaT) par None
-df_cmd["date_commande"] = df_cmd["date_commande"].where(df_cmd["date_commande"].notna(), None)
-df_cmd["date"] = df_cmd["date"].where(df_cmd["date"].notna(), None)
-
-cursor.execute("DROP TABLE IF EXISTS commandes")
-cursor.execute("""
-CREATE TABLE commandes (
-    commande_id INT,
-    date_commande DATETIME,
-    quantite FLOAT,
-    fournisseur_id VARCHAR(20),
-    article_id VARCHAR(20),
-    libelle_article VARCHAR(100),
-    type_achat VARCHAR(20),
-    montant_commande FLOAT,
-    `Montant Offre` FLOAT,
-    date DATETIME,
-    mode_paiement VARCHAR(50)
-)
-""")
 
-insert_cmd = """
-INSERT INTO commandes VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-"""
-for _, row in df_cmd.iterrows():
-    cursor.execute(insert_cmd, tuple(row))
+# 🔤 Lecture en texte : validation.py convertit les colonnes numériques et met en quarantaine
+# les valeurs non convertibles (les dates sont converties après lecture)
+def dtype_pandas(type_sql):
+    if type_sql == "DATETIME":
+        return "object"
+    return "string"
 
 
-# ✅ FOURNISSEURS
-df_fourn = pd.read_csv("data/Fournisseur.csv")
-df_fourn = clean_df(df_fourn)
+# 📖 Lecture d'un CSV par morceaux de taille fixe, colonnes renommées selon le schéma
+def lire_csv_par_morceaux(nom, read_chunk_size=READ_CHUNK_SIZE):
+    colonnes = TABLES[nom]["colonnes"]
+    return pd.read_csv(
+        TABLES[nom]["fichier"],
+        header=0,
+        names=[col for col, _ in colonnes],
+        dtype={col: dtype_pandas(type_sql) for col, type_sql in colonnes},
+        na_values=["null"],
+        chunksize=read_chunk_size
+    )
 
-cursor.execute("DROP TABLE IF EXISTS fournisseurs")
-cursor.execute("""
-CREATE TABLE fournisseurs (
-    famille_article INT,
-    fournisseur_id VARCHAR(20),
-    article_id VARCHAR(20)
-)
-""")
-
-insert_fourn = "INSERT INTO fournisseurs VALUES (%s, %s, %s)"
-for _, row in df_fourn.iterrows():
-    cursor.execute(insert_fourn, tuple(row))
-
-# ✅ DEMANDES MATIERE
-df_dm = pd.read_csv("data/DM.csv")
-df_dm = clean_df(df_dm)
-
-cursor.execute("DROP TABLE IF EXISTS demandes_matiere")
-cursor.execute("""
-CREATE TABLE demandes_matiere (
-    dm_id INT,
-    article_id VARCHAR(20),
-    quantite FLOAT,
-    direction VARCHAR(50)
-)
-""")
 
-insert_dm = "INSERT INTO demandes_matiere VALUES (%s, %s, %s, %s)"
-for _, row in df_dm.iterrows():
-    cursor.execute(insert_dm, tuple(row))
+# 🕒 Conversion intelligente des dates (si invalide → NaT, inséré comme NULL)
+def preparer_commandes(df):
+    df["date_commande"] = pd.to_datetime(df["date_commande"], errors="coerce")
+    df["date"] = pd.to_datetime(df["date"], errors="coerce")
+    return df
+
+
+PREPARATIONS = {"commandes": preparer_commandes}
+
+
+# 🔢 Rang de chaque ligne parmi celles de même clé, continu d'un morceau à l'autre
+def numeroter_lignes(df, colonnes_cle, compteur):
+    rang = df.groupby(colonnes_cle, dropna=False, sort=False).cumcount().to_numpy()
+    cles = pd.MultiIndex.from_frame(df[colonnes_cle])
+    deja_vus = compteur.reindex(cles, fill_value=0).to_numpy()
+    df["ligne"] = rang + deja_vus
+    tailles = df.groupby(colonnes_cle, dropna=False, sort=False).size()
+    return compteur.add(tailles, fill_value=0).astype("int64")
+
+
+# 🔄 DataFrame → tuples Python (NaN/NaT/pd.NA → None, dates au format MySQL)
+def lignes_sql(df):
+    df = df.copy()
+    for col in df.columns:
+        if pd.api.types.is_datetime64_any_dtype(df[col]):
+            df[col] = df[col].dt.strftime("%Y-%m-%d %H:%M:%S")
+    df = df.astype(object).where(df.notna(), None)
+    return list(df.itertuples(index=False, name=None))
+
+
+# 🚚 Insertion par lots : une requête multi-lignes par lot au lieu d'une par ligne
+def inserer_executemany(cursor, nom, df, chunk_size=CHUNK_SIZE):
+    colonnes = ", ".join(f"`{col}`" for col in df.columns)
+    placeholders = ", ".join(["%s"] * len(df.columns))
+    requete = f"INSERT INTO {nom} ({colonnes}) VALUES ({placeholders})"
+    for debut in range(0, len(df), chunk_size):
+        cursor.executemany(requete, lignes_sql(df.iloc[debut:debut + chunk_size]))
+
+
+def local_infile_disponible(cursor):
+    cursor.execute("SHOW GLOBAL VARIABLES LIKE 'local_infile'")
+    resultat = cursor.fetchone()
+    return bool(resultat) and str(resultat[1]).upper() in ("ON", "1")
+
+
+# 📂 Chargement via un fichier CSV temporaire et LOAD DATA LOCAL INFILE
+def inserer_load_data(cursor, nom, df):
+    colonnes = ", ".join(f"`{col}`" for col in df.columns)
+    fd, chemin = tempfile.mkstemp(prefix=f"{nom}_", suffix=".csv")
+    os.close(fd)
+    try:
+        df.to_csv(chemin, index=False, header=False, na_rep="\\N",
+                  date_format="%Y-%m-%d %H:%M:%S", lineterminator="\n")
+        cursor.execute(f"""
+            LOAD DATA LOCAL INFILE '{chemin.replace(os.sep, '/')}'
+            INTO TABLE {nom}
+            CHARACTER SET utf8mb4
+            FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '"'
+            LINES TERMINATED BY '\\n'
+            ({colonnes})
+        """)
+    finally:
+        os.remove(chemin)
+
+
+def inserer_morceau(cursor, nom, df, chunk_size=CHUNK_SIZE, load_data=False):
+    if load_data:
+        try:
+            inserer_load_data(cursor, nom, df)
+            return "load data"
+        except connecteur.Error as e:
+            print(f"⚠️ LOAD DATA LOCAL INFILE refusé pour {nom} ({e}), repli sur executemany.")
+    inserer_executemany(cursor, nom, df, chunk_size)
+    return "executemany"
+
+
+# 🧹 Morceaux validés, préparés, numérotés et marqués (anomalies), lus un par un dans le CSV
+def morceaux_prepares(nom, validateur, read_chunk_size=READ_CHUNK_SIZE):
+    compteur = None
+    colonnes_calculees = [col for col, _ in TABLES[nom].get("colonnes_calculees", [])]
+    detecteur = anomalies.DetecteurAnomalies() if "anomalies" in colonnes_calculees else None
+    for morceau in lire_csv_par_morceaux(nom, read_chunk_size):
+        morceau = validateur.valider(clean_df(morceau))
+        if nom in PREPARATIONS:
+            morceau = PREPARATIONS[nom](morceau)
+        if "ligne" in (TABLES[nom]["cle"] or []):
+            colonnes_cle = [col for col in TABLES[nom]["cle"] if col != "ligne"]
+            if compteur is None:
+                compteur = pd.Series(0, index=pd.MultiIndex.from_frame(morceau[colonnes_cle].iloc[:0]),
+                                     dtype="int64")
+            compteur = numeroter_lignes(morceau, colonnes_cle, compteur)
+        if detecteur:
+            morceau = detecteur.marquer(morceau)
+        yield morceau
+    if validateur.rejetees:
+        print(f"⚠️ {nom} : {validateur.rejetees} ligne(s) rejetée(s), voir {validateur.quarantaine}")
+    if detecteur and detecteur.resume():
+        print(f"🚩 {nom} : lignes signalées ({detecteur.resume()}), colonne anomalies")
+
+
+# 🌊 Chaque morceau est écrit avant la lecture du suivant
+def charger_staging(cursor, nom, staging, morceaux, chunk_size=CHUNK_SIZE, load_data=False, ecrivain=None):
+    creer_table(cursor, nom, staging, index_secondaires=False)
+
+    lignes = 0
+    date_max = None
+    colonne_date = TABLES[nom].get("colonne_date")
+    methode = "load data" if load_data else "executemany"
+    for morceau in morceaux:
+        if colonne_date and morceau[colonne_date].notna().any():
+            max_morceau = morceau[colonne_date].max()
+            date_max = max_morceau if date_max is None else max(date_max, max_morceau)
+        if ecrivain:
+            ecrivain.ecrire(morceau)
+        methode = inserer_morceau(cursor, staging, morceau, chunk_size, load_data)
+        # Après un refus du serveur, inutile de retenter LOAD DATA pour les morceaux suivants
+        load_data = methode == "load data"
+        lignes += len(morceau)
+    return lignes, date_max, methode
+
+
+# 🧩 Upsert des seules lignes nouvelles ou modifiées (DML seulement, sans commit : plusieurs
+# tables peuvent être fusionnées dans la même transaction) ; renvoie aussi si les rollups ont suivi
+def fusionner_delta(cursor, nom, staging):
+    cle = TABLES[nom]["cle"]
+    autres = [col for col, _ in colonnes_table(nom) if col not in cle]
+    jointure = " AND ".join(f"t.`{col}` <=> s.`{col}`" for col in cle)
+    identiques = " AND ".join(f"t.`{col}` <=> s.`{col}`" for col in cle + autres)
+    affectation = ", ".join(f"t.`{col}` = s.`{col}`" for col in autres)
+    colonnes = ", ".join(f"`{col}`" for col, _ in colonnes_table(nom))
+    colonnes_s = ", ".join(f"s.`{col}`" for col, _ in colonnes_table(nom))
+
+    # Delta : lignes du fichier absentes à l'identique de la table courante
+    delta = f"{nom}_delta"
+    cursor.execute(f"DROP TEMPORARY TABLE IF EXISTS {delta}")
+    cursor.execute(f"""
+        CREATE TEMPORARY TABLE {delta} AS
+        SELECT s.* FROM {staging} s
+        WHERE NOT EXISTS (SELECT 1 FROM {nom} t WHERE {identiques})
+    """)
+    avec_rollups = bool(rollups.rollups_de(nom)) and rollups.rollups_presents(cursor, nom)
+    if avec_rollups:
+        rollups.collecter_impacts(cursor, nom, delta, jointure)
+
+    cursor.execute(f"""
+        UPDATE {nom} t JOIN {delta} s ON {jointure}
+        SET {affectation}
+    """)
+    modifiees = cursor.rowcount
+    cursor.execute(f"""
+        INSERT INTO {nom} ({colonnes})
+        SELECT {colonnes_s} FROM {delta} s
+        WHERE NOT EXISTS (SELECT 1 FROM {nom} t WHERE {jointure})
+    """)
+    nouvelles = cursor.rowcount
+    if avec_rollups:
+        rollups.rafraichir(cursor, nom)
+    cursor.execute(f"DROP TEMPORARY TABLE {delta}")
+    return nouvelles, modifiees, avec_rollups
+
+
+# 🧹 Après le commit : suppression de la staging et reconstruction des rollups absents (DDL)
+def terminer_fusion(cursor, nom, staging, avec_rollups):
+    cursor.execute(f"DROP TABLE {staging}")
+    if rollups.rollups_de(nom) and not avec_rollups:
+        rollups.reconstruire(cursor, nom)
+
+
+# 🧩 Fusion d'une table en une transaction
+def fusionner_staging(conn, cursor, nom, staging):
+    nouvelles, modifiees, avec_rollups = fusionner_delta(cursor, nom, staging)
+    conn.commit()
+    terminer_fusion(cursor, nom, staging, avec_rollups)
+    return nouvelles, modifiees
+
+
+# 💧 Watermark par fichier : taille, date de modification, empreinte et date max chargée
+def creer_table_watermarks(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS ingest_watermarks (
+            fichier VARCHAR(255) PRIMARY KEY,
+            taille BIGINT,
+            mtime DOUBLE,
+            sha256 CHAR(64),
+            date_max DATETIME,
+            lignes INT,
+            charge_le DATETIME
+        )
+    """)
+
+
+# 🏁 Journal des chargements : les dashboards invalident leur cache quand un nouveau run_id apparaît
+def creer_table_ingest_runs(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS ingest_runs (
+            run_id INT AUTO_INCREMENT PRIMARY KEY,
+            debut DATETIME,
+            termine_le DATETIME,
+            mode VARCHAR(20)
+        )
+    """)
+
+
+def enregistrer_run(cursor, debut, mode):
+    cursor.execute("INSERT INTO ingest_runs (debut, termine_le, mode) VALUES (%s, NOW(), %s)", (debut, mode))
+
+
+def empreinte_fichier(chemin):
+    h = hashlib.sha256()
+    with open(chemin, "rb") as f:
+        for bloc in iter(lambda: f.read(1 << 20), b""):
+            h.update(bloc)
+    return h.hexdigest()
+
+
+def lire_watermark(cursor, fichier):
+    cursor.execute("SELECT taille, mtime, sha256 FROM ingest_watermarks WHERE fichier = %s", (fichier,))
+    return cursor.fetchone()
+
+
+def fichier_inchange(cursor, fichier):
+    watermark = lire_watermark(cursor, fichier)
+    if watermark is None:
+        return False
+    stat = os.stat(fichier)
+    taille, mtime, sha256 = watermark
+    if taille == stat.st_size and mtime == stat.st_mtime:
+        return True
+    if empreinte_fichier(fichier) != sha256:
+        return False
+    # Fichier réécrit à l'identique : seule la date de modification est mise à jour
+    cursor.execute("UPDATE ingest_watermarks SET taille = %s, mtime = %s WHERE fichier = %s",
+                   (stat.st_size, stat.st_mtime, fichier))
+    return True
+
+
+def ecrire_watermark(cursor, fichier, sha256, date_max, lignes):
+    stat = os.stat(fichier)
+    cursor.execute("""
+        REPLACE INTO ingest_watermarks (fichier, taille, mtime, sha256, date_max, lignes, charge_le)
+        VALUES (%s, %s, %s, %s, %s, %s, NOW())
+    """, (fichier, stat.st_size, stat.st_mtime, sha256,
+          None if date_max is None else date_max.to_pydatetime(), lignes))
+
+
+def fusion_possible(cursor, nom, incremental):
+    return bool(
+        incremental
+        and TABLES[nom]["cle"]
+        and table_existe(cursor, nom)
+        and colonnes_existantes(cursor, nom) == [col for col, _ in colonnes_table(nom)]
+    )
+
+
+# 🧬 Esquisses par mois (cf. esquisses.py), reconstruites depuis le rollup le plus fin une fois
+# commandes à jour dans MySQL, et publiées avec l'empreinte du CSV chargé (seulement avec --esquisses)
+def publier_esquisses(cursor, empreinte):
+    colonnes = ["article_id", "fournisseur_id", "mois", "montant_commande"]
+    cursor.execute(f"SELECT {', '.join(colonnes)} FROM rollup_article_fournisseur_mois")
+    df = pd.DataFrame(cursor.fetchall(), columns=colonnes)
+    esquisses.enregistrer(esquisses.construire(df), empreinte)
+
+
+def resultat_inchange(nom, debut):
+    return {"table": nom, "lignes": 0, "secondes": time.perf_counter() - debut,
+            "methode": "inchangé", "nouvelles": 0, "modifiees": 0, "rejetees": 0}
+
+
+def charger_table(conn, nom, chunk_size=CHUNK_SIZE, load_data=False, read_chunk_size=READ_CHUNK_SIZE,
+                  incremental=False, parquet=False, esquisser=False):
+    debut = time.perf_counter()
+    cursor = conn.cursor()
+    fichier = TABLES[nom]["fichier"]
+
+    if incremental and fichier_inchange(cursor, fichier):
+        conn.commit()
+        cursor.close()
+        return resultat_inchange(nom, debut)
+    empreinte = empreinte_fichier(fichier)
+
+    staging = nom + SUFFIXE_STAGING
+    validateur = validation.Validateur(nom)
+    ecrivain = parquet_cache.EcrivainParquet(nom) if parquet else None
+    try:
+        lignes, date_max, methode = charger_staging(
+            cursor, nom, staging, morceaux_prepares(nom, validateur, read_chunk_size),
+            chunk_size, load_data, ecrivain
+        )
+    except Exception:
+        if ecrivain:
+            ecrivain.abandonner()
+        raise
+    conn.commit()
+
+    if fusion_possible(cursor, nom, incremental):
+        nouvelles, modifiees = fusionner_staging(conn, cursor, nom, staging)
+    else:
+        ajouter_index(cursor, nom, staging)
+        echanger_tables(cursor, nom, staging)
+        rollups.reconstruire(cursor, nom)
+        nouvelles, modifiees = lignes, 0
+
+    ecrire_watermark(cursor, fichier, empreinte, date_max, lignes)
+    conn.commit()
+    if esquisser and nom == "commandes":
+        publier_esquisses(cursor, empreinte)
+    cursor.close()
+    # 🗃️ Le cache Parquet n'est publié qu'une fois MySQL à jour, avec la même empreinte
+    if ecrivain:
+        ecrivain.publier(empreinte)
+
+    duree = time.perf_counter() - debut
+    return {"table": nom, "lignes": lignes, "secondes": duree, "methode": methode,
+            "nouvelles": nouvelles, "modifiees": modifiees, "rejetees": validateur.rejetees}
+
+
+# ⚙️ Mode parallèle (--workers > 1) en trois étapes :
+# 1. un pool de processus lit, valide et prépare chaque CSV (morceaux sérialisés sur disque) ;
+# 2. un pool de threads charge chaque table staging sur sa propre connexion du pool MySQL,
+#    dès que son CSV est prêt ;
+# 3. si toutes les tables ont réussi : un seul RENAME TABLE échange les tables remplacées,
+#    puis les fusions incrémentales, les rollups et les watermarks. Sinon les tables staging
+#    sont supprimées et les tables en place restent intactes.
+def preparer_fichier(nom, read_chunk_size, dossier):
+    validateur = validation.Validateur(nom)
+    chemins = []
+    for i, morceau in enumerate(morceaux_prepares(nom, validateur, read_chunk_size)):
+        chemin = os.path.join(dossier, f"{nom}-{i:05d}.pkl")
+        morceau.to_pickle(chemin)
+        chemins.append(chemin)
+    return chemins, validateur.rejetees
+
+
+def relire_morceaux(chemins):
+    for chemin in chemins:
+        yield pd.read_pickle(chemin)
+
+
+def charger_staging_pool(pool, nom, preparation, chunk_size, load_data, incremental, parquet):
+    chemins, rejetees = preparation.result()
+    debut = time.perf_counter()
+    conn = pool.get_connection()
+    ecrivain = None
+    try:
+        ecrivain = parquet_cache.EcrivainParquet(nom) if parquet else None
+        cursor = conn.cursor()
+        staging = nom + SUFFIXE_STAGING
+        lignes, date_max, methode = charger_staging(cursor, nom, staging, relire_morceaux(chemins),
+                                                    chunk_size, load_data, ecrivain)
+        fusion = fusion_possible(cursor, nom, incremental)
+        if not fusion:
+            ajouter_index(cursor, nom, staging)
+        conn.commit()
+        cursor.close()
+    except Exception:
+        if ecrivain:
+            ecrivain.abandonner()
+        raise
+    finally:
+        conn.close()  # rendue au pool
+    return {"lignes": lignes, "date_max": date_max, "methode": methode, "rejetees": rejetees,
+            "fusion": fusion, "ecrivain": ecrivain, "secondes": time.perf_counter() - debut}
+
+
+def charger_tables_en_parallele(conn, noms, workers, chunk_size=CHUNK_SIZE, load_data=False,
+                                read_chunk_size=READ_CHUNK_SIZE, incremental=False, parquet=False, esquisser=False):
+    debut = time.perf_counter()
+    cursor = conn.cursor()
+    resultats = {}
+    a_charger = []
+    for nom in noms:
+        if incremental and fichier_inchange(cursor, TABLES[nom]["fichier"]):
+            resultats[nom] = resultat_inchange(nom, debut)
+        else:
+            a_charger.append(nom)
+    conn.commit()
+    if not a_charger:
+        cursor.close()
+        return [resultats[nom] for nom in noms]
+    empreintes = {nom: empreinte_fichier(TABLES[nom]["fichier"]) for nom in a_charger}
+
+    taille = min(workers, len(a_charger))
+    dossier = tempfile.mkdtemp(prefix="ingest_")
+    charges, erreurs = {}, {}
+    try:
+        pool = pooling.MySQLConnectionPool(pool_name="ingest", pool_size=taille, **MYSQL_CONFIG)
+        with ProcessPoolExecutor(max_workers=taille) as processus, ThreadPoolExecutor(max_workers=taille) as threads:
+            chargements = {
+                nom: threads.submit(
+                    charger_staging_pool, pool, nom, processus.submit(preparer_fichier, nom, read_chunk_size, dossier),
+                    chunk_size, load_data, incremental, parquet
+                )
+                for nom in a_charger
+            }
+            for nom, chargement in chargements.items():
+                try:
+                    charges[nom] = chargement.result()
+                except Exception as e:
+                    erreurs[nom] = e
+    finally:
+        shutil.rmtree(dossier, ignore_errors=True)
+
+    if erreurs:
+        for nom in a_charger:
+            cursor.execute(f"DROP TABLE IF EXISTS {nom + SUFFIXE_STAGING}")
+            if nom in charges and charges[nom]["ecrivain"]:
+                charges[nom]["ecrivain"].abandonner()
+        cursor.close()
+        for nom, e in erreurs.items():
+            print(f"❌ {nom} : {e}")
+        raise next(iter(erreurs.values()))
+
+    # 🔀 Étape finale, sur la connexion principale
+    # 1. Toutes les fusions (DML et watermarks) dans une seule transaction, avant tout DDL :
+    #    RENAME et reconstruction des rollups valident implicitement la transaction en cours
+    fusionnees = [nom for nom in a_charger if charges[nom]["fusion"]]
+    remplacees = [nom for nom in a_charger if not charges[nom]["fusion"]]
+    suivies = {}
+    try:
+        for nom in fusionnees:
+            charge = charges[nom]
+            charge["nouvelles"], charge["modifiees"], suivies[nom] = fusionner_delta(
+                cursor, nom, nom + SUFFIXE_STAGING
+            )
+            ecrire_watermark(cursor, TABLES[nom]["fichier"], empreintes[nom], charge["date_max"], charge["lignes"])
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    # 2. Échange groupé des tables remplacées, puis DDL de fin
+    echanger_ensemble(cursor, remplacees)
+    for nom in remplacees:
+        rollups.reconstruire(cursor, nom)
+        charge = charges[nom]
+        charge["nouvelles"], charge["modifiees"] = charge["lignes"], 0
+        ecrire_watermark(cursor, TABLES[nom]["fichier"], empreintes[nom], charge["date_max"], charge["lignes"])
+    conn.commit()
+    for nom in fusionnees:
+        terminer_fusion(cursor, nom, nom + SUFFIXE_STAGING, suivies[nom])
+    if esquisser and "commandes" in a_charger:
+        publier_esquisses(cursor, empreintes["commandes"])
+    cursor.close()
+    for nom in a_charger:
+        if charges[nom]["ecrivain"]:
+            charges[nom]["ecrivain"].publier(empreintes[nom])
+
+    for nom, charge in charges.items():
+        resultats[nom] = {"table": nom, "lignes": charge["lignes"], "secondes": charge["secondes"],
+                          "methode": charge["methode"], "nouvelles": charge["nouvelles"],
+                          "modifiees": charge["modifiees"], "rejetees": charge["rejetees"]}
+    return [resultats[nom] for nom in noms]
+
+
+# 📊 Résumé lignes/seconde par table
+def afficher_resume(resultats):
+    print(f"{'table':<20}{'méthode':<14}{'lignes':>10}{'nouvelles':>11}{'modifiées':>11}{'rejetées':>10}"
+          f"{'secondes':>10}{'lignes/s':>12}")
+    for r in resultats:
+        debit = r["lignes"] / r["secondes"] if r["secondes"] > 0 else 0
+        print(f"{r['table']:<20}{r['methode']:<14}{r['lignes']:>10}{r['nouvelles']:>11}{r['modifiees']:>11}"
+              f"{r['rejetees']:>10}{r['secondes']:>10.2f}{debit:>12,.0f}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Chargement des CSV ONCF dans MySQL")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE,
+                        help="nombre de lignes par lot executemany")
+    parser.add_argument("--load-data", action="store_true",
+                        help="utiliser LOAD DATA LOCAL INFILE si le serveur l'autorise")
+    parser.add_argument("--read-chunk-size", type=int, default=READ_CHUNK_SIZE,
+                        help="nombre de lignes lues à la fois dans chaque CSV")
+    parser.add_argument("--incremental", action="store_true",
+                        help="ignorer les fichiers inchangés et n'upserter que les lignes nouvelles ou modifiées")
+    parser.add_argument("--sans-parquet", action="store_true",
+                        help="ne pas écrire le cache Parquet des tables nettoyées")
+    parser.add_argument("--esquisses", action="store_true", default=esquisses.ACTIVEES,
+                        help="reconstruire les esquisses par mois des KPIs fournisseurs et du top 5 "
+                             "(cf. esquisses.py ; par défaut si ONCF_ESQUISSES=1)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="nombre de tables préparées et chargées en parallèle (1 = séquentiel)")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    debut_run = datetime.datetime.now()
+    conn = connecteur.connect(**MYSQL_CONFIG)
+    cursor = conn.cursor()
+
+    load_data = args.load_data and local_infile_disponible(cursor)
+    if args.load_data and not load_data:
+        print("⚠️ local_infile désactivé sur le serveur, chargement par executemany.")
+    creer_table_watermarks(cursor)
+    creer_table_ingest_runs(cursor)
+    cursor.close()
+
+    parquet = not args.sans_parquet and parquet_cache.disponible()
+    if not args.sans_parquet and not parquet:
+        print("⚠️ pyarrow non installé, cache Parquet désactivé.")
+
+    if args.workers > 1:
+        # ⚡ Tables préparées et chargées en parallèle, échangées ensemble à la fin
+        resultats = charger_tables_en_parallele(
+            conn, list(TABLES), args.workers, chunk_size=args.chunk_size, load_data=load_data,
+            read_chunk_size=args.read_chunk_size, incremental=args.incremental, parquet=parquet,
+            esquisser=args.esquisses
+        )
+    else:
+        # ✅ Chaque table est validée (commit) puis échangée ou fusionnée séparément
+        resultats = [
+            charger_table(conn, nom, chunk_size=args.chunk_size, load_data=load_data,
+                          read_chunk_size=args.read_chunk_size, incremental=args.incremental, parquet=parquet,
+                          esquisser=args.esquisses)
+            for nom in TABLES
+        ]
+
+    # 📣 Signale la fin du chargement aux dashboards (invalidation de leur cache), sauf si
+    # --incremental n'a trouvé aucun fichier modifié : les données servies restent à jour
+    if any(r["methode"] != "inchangé" for r in resultats):
+        cursor = conn.cursor()
+        enregistrer_run(cursor, debut_run, "incremental" if args.incremental else "complet")
+        conn.commit()
+        cursor.close()
+    conn.close()
+
+    afficher_resume(resultats)
+    print("✅ Toutes les tables ont été insérées avec succès dans MySQL.")
 
-# ✅ Commit final
-conn.commit()
-cursor.close()
-conn.close()
 
-print("✅ Toutes les tables ont été insérées avec succès dans MySQL.")
+if __name__ == "__main__":
+    main()
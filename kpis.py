@@ -0,0 +1,279 @@
+# 🧠 KPIs du dashboard test.py, mémoïsés par état des filtres
+# Chaque section est une fonction en cache LRU dont la clé est (lecteur, version, année, fournisseur) :
+# changer un widget ne recalcule que les sections qui en dépendent. Les entrées d'une version
+# remplacée ne servent plus mais garderaient leurs DataFrames (détail d'une année entière compris)
+# jusqu'à leur éviction : test.py appelle vider() à chaque bascule de data_access.py.
+# Seuls les calculs effectifs (échecs du cache) apparaissent dans chrono.py.
+# Les DataFrames renvoyés sont partagés entre les reruns et les sessions : ne jamais les modifier.
+from functools import lru_cache
+
+import chrono
+import esquisses
+import paresseux
+import prevision
+import queries
+from indexation import IndexGroupes
+from schema import TABLES
+
+pd = paresseux.module("pandas")
+
+# 🗄️ Nombre de combinaisons (année, fournisseur) conservées par section
+TAILLE_CACHE = 32
+# Le graphique du détail annuel a une entrée par article consulté (cf. figures.py)
+TAILLE_CACHE_ARTICLE = 256
+# 🧬 Requêtes exactes par défaut. ONCF_ESQUISSES=1 tire des esquisses par mois (cf. esquisses.py)
+# les KPIs fournisseurs et le top 5 de tout l'historique sans filtre, seul cas où la requête exacte
+# parcourt le rollup le plus fin en entier ; une année se lit plus vite, et exactement, dans les rollups
+ESQUISSES = esquisses.ACTIVEES
+
+
+# 📥 Données indépendantes des filtres
+@lru_cache(maxsize=2)
+@chrono.chronometre("kpi")
+def articles(lire, version):
+    return queries.articles(lire)
+
+
+@lru_cache(maxsize=2)
+@chrono.chronometre("kpi")
+def demandes(lire, version):
+    return queries.demandes_par_article(lire)
+
+
+# 📊 Agrégations filtrées
+@lru_cache(maxsize=TAILLE_CACHE)
+@chrono.chronometre("kpi")
+def agg_global(lire, version, annee, fournisseur):
+    return queries.agg_global(lire, annee=annee, fournisseur=fournisseur)
+
+
+@lru_cache(maxsize=TAILLE_CACHE)
+@chrono.chronometre("kpi")
+def articles_commandes(lire, version, annee, fournisseur):
+    df = pd.merge(
+        articles(lire, version), agg_global(lire, version, annee, fournisseur), how='inner', on='article_id'
+    ).sort_values(by='montant_total_payé', ascending=False)
+    df = pd.merge(df, demandes(lire, version), how='left', on='article_id')
+    df['ecart_dm_stock'] = df['quantite_commandee_total'] - df['quantite_dm']
+    return df
+
+
+@lru_cache(maxsize=TAILLE_CACHE)
+@chrono.chronometre("kpi")
+def articles_non_commandes(lire, version, annee, fournisseur):
+    df = pd.merge(
+        articles(lire, version), agg_global(lire, version, annee, fournisseur)[['article_id']],
+        how='left', indicator=True, on='article_id'
+    )
+    return df[df['_merge'] == 'left_only'].drop(columns=['_merge'])
+
+
+@lru_cache(maxsize=TAILLE_CACHE)
+@chrono.chronometre("kpi")
+def agg_par_annee(lire, version, annee, fournisseur):
+    return pd.merge(
+        queries.agg_par_annee(lire, annee=annee, fournisseur=fournisseur),
+        articles(lire, version)[['article_id', 'designation']],
+        how='left', on='article_id'
+    )
+
+
+@lru_cache(maxsize=TAILLE_CACHE)
+@chrono.chronometre("kpi")
+def articles_avec_demande(lire, version, annee, fournisseur):
+    df = articles_commandes(lire, version, annee, fournisseur)
+    return df[df['quantite_dm'].notnull()]
+
+
+# 🔢 KPIs principaux, avancés et analytiques
+@lru_cache(maxsize=TAILLE_CACHE)
+@chrono.chronometre("kpi")
+def indicateurs(lire, version, annee, fournisseur):
+    agg = agg_global(lire, version, annee, fournisseur)
+    commandes = articles_commandes(lire, version, annee, fournisseur)
+    avec_demande = articles_avec_demande(lire, version, annee, fournisseur)
+    par_annee = agg_par_annee(lire, version, annee, fournisseur)
+
+    montant_total = agg['montant_total_payé'].sum()
+    quantite_totale = agg['quantite_commandee_total'].sum()
+    total_dm = avec_demande['quantite_dm'].sum()
+    resultat = {
+        "total_articles": len(articles(lire, version)),
+        "nb_commandes": len(commandes),
+        "nb_non_commandes": len(articles_non_commandes(lire, version, annee, fournisseur)),
+        "montant_total": montant_total,
+        "quantite_totale": quantite_totale,
+        "top_qte": None,
+        "top_cost": None,
+        "annee_max": (
+            par_annee.groupby('annee')['montant_annuel_payé'].sum().idxmax() if not par_annee.empty else None
+        ),
+        "prix_moyen": montant_total / quantite_totale if quantite_totale > 0 else 0,
+        "taux_utilisation": len(avec_demande) / len(commandes) * 100 if len(commandes) > 0 else 0,
+        "ratio_global": avec_demande['quantite_commandee_total'].sum() / total_dm if total_dm else 0,
+        "nb_surstock": int((avec_demande['ecart_dm_stock'] > 0).sum()),
+    }
+    if not commandes.empty:
+        resultat["top_qte"] = commandes.sort_values(by='quantite_commandee_total', ascending=False).iloc[0]
+        resultat["top_cost"] = commandes.iloc[0]
+    return resultat
+
+
+# 🧬 Esquisses du chargement servi, si elles correspondent au CSV commandes en base
+@lru_cache(maxsize=2)
+@chrono.chronometre("kpi")
+def esquisses_mois(lire, version):
+    if not ESQUISSES:
+        return None
+    empreinte = queries.empreinte_source(lire, TABLES["commandes"]["fichier"])
+    return esquisses.lire(empreinte) if empreinte else None
+
+
+# Fusion de tous les mois ; None si pas d'esquisses
+@lru_cache(maxsize=2)
+@chrono.chronometre("kpi")
+def fusion_esquisses(lire, version):
+    par_mois = esquisses_mois(lire, version)
+    return esquisses.fusionner(par_mois) if par_mois else None
+
+
+@lru_cache(maxsize=TAILLE_CACHE)
+@chrono.chronometre("kpi")
+def indicateurs_fournisseurs(lire, version, annee, fournisseur):
+    fusion = fusion_esquisses(lire, version) if annee is None and fournisseur is None else None
+    if fusion is not None:
+        return esquisses.indicateurs_fournisseurs(fusion)
+    par_article = queries.fournisseurs_par_article(lire, annee=annee, fournisseur=fournisseur)
+    return {
+        "moy_fournisseurs": par_article['nb_fournisseurs'].mean(),
+        "pct_multi_fournisseurs": (par_article['nb_fournisseurs'] > 1).mean() * 100,
+    }
+
+
+@lru_cache(maxsize=TAILLE_CACHE)
+@chrono.chronometre("kpi")
+def top_fournisseurs(lire, version, annee, fournisseur):
+    fusion = fusion_esquisses(lire, version) if annee is None and fournisseur is None else None
+    if fusion is not None:
+        return fusion.top_fournisseurs()
+    return queries.top_fournisseurs(lire, annee=annee, fournisseur=fournisseur)
+
+
+@lru_cache(maxsize=TAILLE_CACHE)
+@chrono.chronometre("kpi")
+def quantites_mensuelles(lire, version, annee, fournisseur):
+    return queries.quantites_mensuelles(lire, annee=annee, fournisseur=fournisseur)
+
+
+@lru_cache(maxsize=TAILLE_CACHE)
+@chrono.chronometre("kpi")
+def volatilite(lire, version, annee, fournisseur):
+    return queries.volatilite(lire, annee=annee, fournisseur=fournisseur)
+
+
+# 📋 Lignes détaillées d'une année, indexées par fournisseur : « charger » est data_access.charger_table
+# (Parquet si à jour, sinon MySQL). Changer de fournisseur ne relit ni ne refiltre la table.
+@lru_cache(maxsize=TAILLE_CACHE)
+@chrono.chronometre("kpi")
+def index_detail_commandes(lire, charger, version, annee):
+    df = charger(
+        'commandes',
+        colonnes=['fournisseur_id', 'article_id', 'quantite', 'date_commande'],
+        annees=[annee] if annee else None
+    )
+    df = pd.merge(df, articles(lire, version)[['article_id', 'designation']], how='left', on='article_id')
+    return IndexGroupes(
+        df[['fournisseur_id', 'article_id', 'designation', 'quantite', 'date_commande']],
+        'fournisseur_id', tri=['date_commande']
+    )
+
+
+def detail_commandes(lire, charger, version, annee, fournisseur):
+    index = index_detail_commandes(lire, charger, version, annee)
+    return index.lignes(fournisseur) if fournisseur else index.df
+
+
+# 📅 Historique annuel indexé par désignation, pour le selectbox « Détail Annuel »
+@lru_cache(maxsize=TAILLE_CACHE)
+@chrono.chronometre("kpi")
+def index_par_annee(lire, version, annee, fournisseur):
+    return IndexGroupes(agg_par_annee(lire, version, annee, fournisseur), 'designation', tri=['annee'])
+
+
+def detail_article(lire, version, annee, fournisseur, designation):
+    return index_par_annee(lire, version, annee, fournisseur).lignes(designation)
+
+
+# 📋 Listes des selectbox, construites une fois par version et par filtre
+@lru_cache(maxsize=2)
+@chrono.chronometre("kpi")
+def options_annees(lire, version):
+    return [None] + list(queries.annees_disponibles(lire))
+
+
+@lru_cache(maxsize=TAILLE_CACHE)
+@chrono.chronometre("kpi")
+def options_fournisseurs(lire, version, annee):
+    return [None] + queries.fournisseurs_disponibles(lire, annee=annee)
+
+
+# Articles dans l'ordre du tableau (montant décroissant)
+@lru_cache(maxsize=TAILLE_CACHE)
+@chrono.chronometre("kpi")
+def options_articles(lire, version, annee, fournisseur):
+    return articles_commandes(lire, version, annee, fournisseur)['designation'].tolist()
+
+
+@lru_cache(maxsize=TAILLE_CACHE)
+@chrono.chronometre("kpi")
+def top_surstock(lire, version, annee, fournisseur):
+    df = articles_avec_demande(lire, version, annee, fournisseur)
+    return df[df['ecart_dm_stock'] > 0].sort_values(by='ecart_dm_stock', ascending=False).head(10)
+
+
+@lru_cache(maxsize=TAILLE_CACHE)
+@chrono.chronometre("kpi")
+def top_sousstock(lire, version, annee, fournisseur):
+    df = articles_avec_demande(lire, version, annee, fournisseur)
+    return df[df['ecart_dm_stock'] < 0].sort_values(by='ecart_dm_stock').head(10)
+
+
+@lru_cache(maxsize=TAILLE_CACHE)
+@chrono.chronometre("kpi")
+def montant_par_annee(lire, version, annee, fournisseur):
+    return (
+        agg_par_annee(lire, version, annee, fournisseur).groupby('annee')['montant_annuel_payé'].sum()
+        .reset_index(name='montant_commande')
+    )
+
+
+# 🔮 Prévision du mois suivant et réapprovisionnement (cf. prevision.py), sur tout l'historique
+@lru_cache(maxsize=TAILLE_CACHE)
+@chrono.chronometre("kpi")
+def previsions(lire, version, fournisseur):
+    df = prevision.suggestions(
+        queries.quantites_article_mois(lire, fournisseur=fournisseur), queries.stocks(lire)
+    )
+    return pd.merge(df, articles(lire, version)[['article_id', 'designation']], how='left', on='article_id')
+
+
+SECTIONS = [
+    articles, demandes, esquisses_mois, fusion_esquisses, agg_global, articles_commandes, articles_non_commandes,
+    agg_par_annee, articles_avec_demande, indicateurs, indicateurs_fournisseurs, top_fournisseurs, quantites_mensuelles,
+    volatilite, index_detail_commandes, index_par_annee, options_annees, options_fournisseurs, options_articles,
+    top_surstock, top_sousstock, montant_par_annee, previsions,
+]
+
+
+# 📈 Succès / échecs des caches LRU, pour la sidebar
+def statistiques_cache():
+    return pd.DataFrame([
+        {"section": f.__name__, "hits": info.hits, "calculs": info.misses, "entrées": info.currsize}
+        for f in SECTIONS
+        for info in [f.cache_info()]
+    ])
+
+
+def vider():
+    for f in SECTIONS:
+        f.cache_clear()
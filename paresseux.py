@@ -0,0 +1,35 @@
+# 💤 Imports différés des bibliothèques lourdes (pandas, NumPy, SQLAlchemy, Plotly, pyarrow)
+# « pd = paresseux.module("pandas") » ne coûte rien : le vrai import a lieu au premier accès
+# à un attribut, c.-à-d. au premier calcul, après l'affichage du squelette des pages.
+# ONCF_IMPORTS_IMMEDIATS=1 rétablit les imports immédiats (mesure « avant », cf. benchmarks/bench_demarrage.py).
+import importlib
+import importlib.util
+import os
+
+IMMEDIATS = os.environ.get("ONCF_IMPORTS_IMMEDIATS", "") not in ("", "0")
+
+
+class Module:
+    def __init__(self, nom):
+        self._nom = nom
+        self._module = None
+
+    def __getattr__(self, attribut):
+        if self._module is None:
+            self._module = importlib.import_module(self._nom)
+        return getattr(self._module, attribut)
+
+    def __repr__(self):
+        etat = "importé" if self._module is not None else "différé"
+        return f"<module {self._nom} ({etat})>"
+
+
+def module(nom):
+    if IMMEDIATS:
+        return importlib.import_module(nom)
+    return Module(nom)
+
+
+# 🔎 Présence d'un paquet sans l'importer (dépendances optionnelles)
+def disponible(nom):
+    return importlib.util.find_spec(nom) is not None
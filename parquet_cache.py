@@ -0,0 +1,133 @@
+# 🗃️ Cache Parquet colonnaire des tables nettoyées, écrit par ingest.py et lu par les dashboards
+# commandes est partitionné par année (annee=AAAA/) : un lecteur ne lit que les colonnes
+# et les années demandées. Le manifeste associe chaque table à l'empreinte sha256 du CSV
+# chargé ; si elle ne correspond plus à ingest_watermarks, le cache est considéré périmé.
+import json
+import os
+import shutil
+
+import paresseux
+
+# pyarrow absent : pas de cache, les dashboards lisent MySQL ; présent, il n'est importé qu'à la première lecture
+if paresseux.disponible("pyarrow"):
+    pa = paresseux.module("pyarrow")
+    ds = paresseux.module("pyarrow.dataset")
+    pq = paresseux.module("pyarrow.parquet")
+else:
+    pa = None
+    ds = None
+    pq = None
+
+RACINE = "data/parquet"
+MANIFESTE = "_manifeste.json"
+
+# 🏷️ Colonnes stockées en dictionnaire (category côté pandas)
+COLONNES_CATEGORIELLES = ["article_id", "fournisseur_id", "type_achat", "mode_paiement"]
+
+# 📅 Tables partitionnées : colonne de partition et colonne date dont elle dérive
+PARTITIONS = {"commandes": ("annee", "date_commande")}
+
+
+def disponible():
+    return pq is not None
+
+
+def chemin_table(nom, racine=RACINE):
+    return os.path.join(racine, nom)
+
+
+def lire_manifeste(racine=RACINE):
+    try:
+        with open(os.path.join(racine, MANIFESTE), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def ecrire_manifeste(manifeste, racine=RACINE):
+    temporaire = os.path.join(racine, MANIFESTE + ".tmp")
+    with open(temporaire, "w", encoding="utf-8") as f:
+        json.dump(manifeste, f, indent=2)
+    os.replace(temporaire, os.path.join(racine, MANIFESTE))
+
+
+def typer(df):
+    df = df.copy()
+    for col in COLONNES_CATEGORIELLES:
+        if col in df.columns:
+            df[col] = df[col].astype("category")
+    return df
+
+
+# ✍️ Écriture morceau par morceau dans un répertoire temporaire, publié d'un bloc à la fin
+class EcrivainParquet:
+    def __init__(self, nom, racine=RACINE):
+        self.nom = nom
+        self.racine = racine
+        self.final = chemin_table(nom, racine)
+        self.temporaire = self.final + ".tmp"
+        self.lignes = 0
+        self.morceaux = 0
+        shutil.rmtree(self.temporaire, ignore_errors=True)
+        os.makedirs(self.temporaire)
+
+    def ecrire(self, df):
+        df = typer(df)
+        partition = PARTITIONS.get(self.nom)
+        if partition:
+            col_partition, col_date = partition
+            df[col_partition] = df[col_date].dt.year.astype("Int16")
+        pq.write_to_dataset(
+            pa.Table.from_pandas(df, preserve_index=False),
+            self.temporaire,
+            partition_cols=[partition[0]] if partition else None,
+            basename_template=f"morceau-{self.morceaux:05d}-{{i}}.parquet"
+        )
+        self.morceaux += 1
+        self.lignes += len(df)
+
+    def publier(self, empreinte):
+        ancien = self.final + ".ancien"
+        shutil.rmtree(ancien, ignore_errors=True)
+        if os.path.exists(self.final):
+            os.rename(self.final, ancien)
+        os.rename(self.temporaire, self.final)
+        shutil.rmtree(ancien, ignore_errors=True)
+
+        manifeste = lire_manifeste(self.racine)
+        manifeste[self.nom] = {"empreinte": empreinte, "lignes": self.lignes}
+        ecrire_manifeste(manifeste, self.racine)
+
+    def abandonner(self):
+        shutil.rmtree(self.temporaire, ignore_errors=True)
+
+
+# 📖 Lecture des seules colonnes et années utiles ; None si le cache est absent ou périmé
+def lire(nom, colonnes=None, annees=None, empreinte=None, racine=RACINE, fournisseur=None):
+    if not disponible():
+        return None
+    entree = lire_manifeste(racine).get(nom)
+    if entree is None or (empreinte is not None and entree["empreinte"] != empreinte):
+        return None
+
+    filtres = []
+    partitionnement = None
+    partition = PARTITIONS.get(nom)
+    if partition:
+        partitionnement = ds.partitioning(pa.schema([(partition[0], pa.int16())]), flavor="hive")
+        if annees:
+            filtres.append((partition[0], "in", [int(a) for a in annees]))
+    if fournisseur:
+        filtres.append(("fournisseur_id", "==", fournisseur))
+    df = pq.read_table(
+        chemin_table(nom, racine),
+        columns=colonnes,
+        filters=filtres or None,
+        partitioning=partitionnement
+    ).to_pandas()
+    # Les dictionnaires des fichiers sont fusionnés dans l'ordre de lecture : on retrie les
+    # catégories pour que les tris pandas restent alphabétiques, comme avec astype("category")
+    for col in COLONNES_CATEGORIELLES:
+        if col in df.columns:
+            df[col] = df[col].cat.reorder_categories(sorted(df[col].cat.categories))
+    return df
@@ -0,0 +1,88 @@
+# 🔮 Prévision vectorisée de la demande mensuelle par article, et suggestions de réapprovisionnement
+# Toutes les séries forment une matrice article × mois (mois sans commande = 0) : chaque modèle
+# est une opération NumPy sur la matrice entière, sans boucle Python par article.
+# Modèle : niveau par lissage exponentiel simple (un produit matriciel par les poids du lissage),
+# multiplié par l'indice saisonnier du mois prévu (moyenne de ce mois sur les dernières années
+# rapportée à la moyenne de ces années). Demande intermittente : l'indice vaut 1 tant que ce mois
+# compte moins de OBSERVATIONS_MIN commandes, et il est borné à [INDICE_MIN, INDICE_MAX].
+import paresseux
+
+np = paresseux.module("numpy")
+pd = paresseux.module("pandas")
+
+ALPHA = 0.3
+SAISON = 12
+ANNEES_SAISON = 3
+OBSERVATIONS_MIN = 2
+INDICE_MIN = 0.5
+INDICE_MAX = 2.0
+# 📦 Couverture visée en mois, et coefficient du stock de sécurité (≈ 95 % de service)
+HORIZON = 1
+Z_SECURITE = 1.65
+
+
+# 🧮 Matrice dense article × mois à partir de lignes (article, mois, valeur)
+def matrice(df, colonne_article="article_id", colonne_mois="mois", colonne_valeur="quantite_totale"):
+    mois = pd.to_datetime(df[colonne_mois], errors="coerce")
+    valide = mois.notna().to_numpy()
+    codes, articles = pd.factorize(df[colonne_article].to_numpy()[valide])
+    rang = (mois.dt.year * 12 + mois.dt.month - 1).to_numpy()[valide].astype(np.int64)
+    premier = rang.min() if len(rang) else 0
+    nb_mois = int(rang.max() - premier + 1) if len(rang) else 0
+    valeurs = np.zeros((len(articles), nb_mois))
+    np.add.at(valeurs, (codes, rang - premier), df[colonne_valeur].to_numpy(dtype="float64")[valide])
+    debut = pd.Period(year=premier // 12, month=premier % 12 + 1, freq="M")
+    return valeurs, pd.Index(articles, name=colonne_article), pd.period_range(debut, periods=nb_mois, freq="M")
+
+
+# 📉 Niveau lissé de chaque ligne : le lissage récursif déroulé est une somme pondérée des colonnes
+def lissage_exponentiel(valeurs, alpha=ALPHA):
+    nb_mois = valeurs.shape[1]
+    if nb_mois == 0:
+        return np.zeros(valeurs.shape[0])
+    poids = alpha * (1 - alpha) ** np.arange(nb_mois - 1, -1, -1)
+    poids[0] = (1 - alpha) ** (nb_mois - 1)  # niveau initial = première observation
+    return valeurs @ poids
+
+
+# 📅 Indice saisonnier du mois qui suit la dernière colonne
+def indice_saisonnier(valeurs, saison=SAISON, annees=ANNEES_SAISON):
+    nb_mois = valeurs.shape[1]
+    colonnes = nb_mois - saison * np.arange(1, annees + 1)
+    colonnes = colonnes[colonnes >= 0]
+    if len(colonnes) == 0:
+        return np.ones(valeurs.shape[0])
+    meme_mois = valeurs[:, colonnes].mean(axis=1)
+    observations = (valeurs[:, colonnes] > 0).sum(axis=1)
+    recent = valeurs[:, max(0, nb_mois - saison * annees):].mean(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        indice = np.where((recent > 0) & (observations >= OBSERVATIONS_MIN), meme_mois / recent, 1.0)
+    return np.clip(indice, INDICE_MIN, INDICE_MAX)
+
+
+def prevoir(valeurs, alpha=ALPHA, saison=SAISON, annees=ANNEES_SAISON):
+    return lissage_exponentiel(valeurs, alpha) * indice_saisonnier(valeurs, saison, annees)
+
+
+# 🛒 Prévision du mois suivant et quantité à commander pour couvrir l'horizon, par article
+def suggestions(quantites, stocks=None, horizon=HORIZON, z=Z_SECURITE, alpha=ALPHA):
+    valeurs, articles, mois = matrice(quantites)
+    prevision = prevoir(valeurs, alpha)
+    recents = valeurs[:, -SAISON:]
+    ecart_type = recents.std(axis=1, ddof=1) if recents.shape[1] > 1 else np.zeros(len(articles))
+    resultat = pd.DataFrame({
+        "article_id": articles,
+        "prevision": prevision,
+        "ecart_type": ecart_type,
+        "stock_securite": z * ecart_type * np.sqrt(horizon),
+    })
+    resultat["mois_prevu"] = str(mois[-1] + 1) if len(mois) else None
+    if stocks is not None:
+        stock = stocks.set_index("article_id")["quantite_stock"].astype("float64")
+        resultat["stock"] = stock.reindex(resultat["article_id"]).fillna(0).to_numpy()
+    else:
+        resultat["stock"] = 0.0
+    resultat["a_commander"] = np.maximum(
+        0, resultat["prevision"] * horizon + resultat["stock_securite"] - resultat["stock"]
+    )
+    return resultat.sort_values("a_commander", ascending=False, kind="stable").reset_index(drop=True)
@@ -0,0 +1,218 @@
+# 🔎 Couche de requêtes SQL paramétrées des dashboards (test.py, analysis.py)
+# Les filtres année/fournisseur deviennent des WHERE et les agrégations des GROUP BY :
+# seules les lignes de la réponse transitent entre MySQL et pandas.
+import paresseux
+
+pd = paresseux.module("pandas")
+sqlalchemy = paresseux.module("sqlalchemy")
+
+# 🧮 Rollup le plus petit capable de répondre, selon le grain demandé (cf. rollups.py)
+# Avec un filtre fournisseur, seul le grain article × fournisseur × mois convient.
+ROLLUP_FIN = "rollup_article_fournisseur_mois"
+ROLLUPS_SANS_FOURNISSEUR = {
+    "article": "rollup_article",
+    "article_annee": "rollup_article_annee",
+    "article_mois": "rollup_article_mois",
+    "fournisseur_annee": "rollup_fournisseur_annee",
+}
+
+def choisir_rollup(grain, annee=None, fournisseur=None):
+    if fournisseur:
+        return ROLLUP_FIN
+    if grain == "article" and annee:
+        return ROLLUPS_SANS_FOURNISSEUR["article_annee"]
+    return ROLLUPS_SANS_FOURNISSEUR[grain]
+
+
+def clause_filtres(annee=None, fournisseur=None):
+    conditions, params = [], {}
+    if annee:
+        conditions.append("annee = :annee")
+        params["annee"] = int(annee)
+    if fournisseur:
+        conditions.append("fournisseur_id = :fournisseur")
+        params["fournisseur"] = fournisseur
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    return where, params
+
+
+# 📥 Chaque fonction reçoit un lecteur « lire(sql, params) » : data_access.run_query dans les
+# dashboards (avec cache), ou lecteur(engine) pour les scripts hors Streamlit
+def lecteur(engine):
+    def lire(sql, params=None):
+        return pd.read_sql(sqlalchemy.text(sql), engine, params=params or {})
+    return lire
+
+
+# 🔏 Empreinte sha256 du dernier CSV chargé pour un fichier source (cf. ingest_watermarks)
+def empreinte_source(lire, fichier):
+    df = lire("SELECT sha256 FROM ingest_watermarks WHERE fichier = :fichier", {"fichier": fichier})
+    return df["sha256"].iloc[0] if len(df) else None
+
+
+# 📋 Listes des filtres de la sidebar
+def annees_disponibles(lire):
+    df = lire("SELECT DISTINCT annee FROM rollup_article_annee WHERE annee IS NOT NULL ORDER BY annee")
+    return df["annee"].astype(int).tolist()
+
+
+def fournisseurs_disponibles(lire, annee=None):
+    where, params = clause_filtres(annee)
+    df = lire(f"""
+        SELECT DISTINCT fournisseur_id FROM rollup_fournisseur_annee
+        {where}
+        ORDER BY fournisseur_id
+    """, params)
+    return df["fournisseur_id"].dropna().tolist()
+
+
+def articles(lire):
+    return lire("SELECT article_id, designation FROM articles")
+
+
+# Couples (année, fournisseur) ayant des commandes, pour les rapports par lot (cf. rapport.py)
+def annees_fournisseurs(lire):
+    return lire("""
+        SELECT DISTINCT annee, fournisseur_id FROM rollup_fournisseur_annee
+        WHERE annee IS NOT NULL AND fournisseur_id IS NOT NULL
+        ORDER BY annee, fournisseur_id
+    """)
+
+
+# 📊 Agrégations filtrées
+def agg_global(lire, annee=None, fournisseur=None):
+    where, params = clause_filtres(annee, fournisseur)
+    return lire(f"""
+        SELECT article_id,
+               SUM(quantite) AS quantite_commandee_total,
+               SUM(montant_commande) AS `montant_total_payé`
+        FROM {choisir_rollup("article", annee, fournisseur)}
+        {where}
+        GROUP BY article_id
+    """, params)
+
+
+def agg_par_annee(lire, annee=None, fournisseur=None):
+    where, params = clause_filtres(annee, fournisseur)
+    return lire(f"""
+        SELECT article_id, annee,
+               SUM(quantite) AS quantite_commandee_annuelle,
+               SUM(montant_commande) AS `montant_annuel_payé`
+        FROM {choisir_rollup("article_annee", annee, fournisseur)}
+        {where}
+        GROUP BY article_id, annee
+    """, params)
+
+
+def demandes_par_article(lire):
+    return lire("SELECT article_id, quantite_dm FROM rollup_dm_article")
+
+
+def stocks(lire):
+    return lire("SELECT article_id, quantite_stock FROM articles")
+
+
+# 🔮 Historique mensuel complet par article, pour prevision.py (le filtre année ne s'applique pas)
+def quantites_article_mois(lire, fournisseur=None):
+    where, params = clause_filtres(fournisseur=fournisseur)
+    return lire(f"""
+        SELECT article_id, mois, SUM(quantite) AS quantite_totale
+        FROM {choisir_rollup("article_mois", fournisseur=fournisseur)}
+        {where}
+        GROUP BY article_id, mois
+    """, params)
+
+
+def fournisseurs_par_article(lire, annee=None, fournisseur=None):
+    where, params = clause_filtres(annee, fournisseur)
+    return lire(f"""
+        SELECT article_id, COUNT(DISTINCT fournisseur_id) AS nb_fournisseurs
+        FROM {ROLLUP_FIN}
+        {where}
+        GROUP BY article_id
+    """, params)
+
+
+def top_fournisseurs(lire, annee=None, fournisseur=None, n=5):
+    where, params = clause_filtres(annee, fournisseur)
+    params["n"] = n
+    return lire(f"""
+        SELECT fournisseur_id, SUM(montant_commande) AS montant_commande
+        FROM {choisir_rollup("fournisseur_annee", annee, fournisseur)}
+        {where}
+        GROUP BY fournisseur_id
+        ORDER BY montant_commande DESC
+        LIMIT :n
+    """, params)
+
+
+def quantites_mensuelles(lire, annee=None, fournisseur=None):
+    where, params = clause_filtres(annee, fournisseur)
+    return lire(f"""
+        SELECT DATE_FORMAT(mois, '%Y-%m') AS mois, SUM(quantite) AS quantite_totale
+        FROM {choisir_rollup("article_mois", annee, fournisseur)}
+        {where}
+        GROUP BY mois
+        ORDER BY mois
+    """, params)
+
+
+# ⚡ Écart-type (échantillon, comme pandas) des quantités mensuelles par article
+def volatilite(lire, annee=None, fournisseur=None, n=5):
+    where, params = clause_filtres(annee, fournisseur)
+    params["n"] = n
+    return lire(f"""
+        SELECT v.article_id, a.designation, v.volatilite_quantite
+        FROM (
+            SELECT article_id, STDDEV_SAMP(quantite_mois) AS volatilite_quantite
+            FROM (
+                SELECT article_id, mois, SUM(quantite) AS quantite_mois
+                FROM {choisir_rollup("article_mois", annee, fournisseur)}
+                {where}
+                GROUP BY article_id, mois
+            ) mensuel
+            GROUP BY article_id
+        ) v
+        JOIN articles a ON a.article_id = v.article_id
+        ORDER BY v.volatilite_quantite DESC
+        LIMIT :n
+    """, params)
+
+
+# 🛒 Lignes de commande du dashboard Achats (analysis.py)
+# fournisseurs et demandes_matiere sont réduits à une ligne par clé AVANT la jointure :
+# chaque ligne de commande apparaît exactement une fois, sans LIMIT ni dédoublonnage.
+REQUETE_ACHATS = """
+SELECT
+    c.commande_id,
+    c.date_commande,
+    c.quantite,
+    c.fournisseur_id,
+    c.article_id,
+    c.libelle_article,
+    c.type_achat,
+    c.montant_commande,
+    a.designation,
+    a.famille_article,
+    f.fournisseur_id AS fournisseur_fk,
+    dm.quantite_dm
+FROM commandes c
+LEFT JOIN articles a ON c.article_id = a.article_id
+LEFT JOIN (
+    SELECT DISTINCT fournisseur_id FROM fournisseurs
+) f ON c.fournisseur_id = f.fournisseur_id
+LEFT JOIN (
+    SELECT article_id, SUM(quantite) AS quantite_dm
+    FROM demandes_matiere
+    GROUP BY article_id
+) dm ON c.article_id = dm.article_id
+"""
+
+
+# Limité aux masques d'anomalies autorisés (cf. anomalies.masques_sans) : prédicat servi par idx_commandes_anomalies
+def commandes_achats(lire, masques=None):
+    if masques is None:
+        return lire(REQUETE_ACHATS)
+    marqueurs = ", ".join(f":masque_{i}" for i in range(len(masques)))
+    params = {f"masque_{i}": int(masque) for i, masque in enumerate(masques)}
+    return lire(REQUETE_ACHATS + f"WHERE c.anomalies IN ({marqueurs})", params)
@@ -0,0 +1,163 @@
+# ▶️ python rapport.py --annees 2023 [--fournisseurs F001 F002] [--format csv|parquet|json] [--workers 4]
+#    python rapport.py --tout --workers 8 : tout l'historique, chaque année, chaque fournisseur de chaque année
+# 🧾 Rapports sans Streamlit : tous les KPIs de test.py (kpis.py) et d'analysis.py (achats.py) pour une
+# année et un fournisseur, calculés en une passe et exportés en CSV, Parquet ou JSON dans --dossier.
+# En parallèle, chaque processus a son propre engine et ses caches kpis.py, partagés par ses rapports.
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+import pandas as pd
+
+import achats
+import affichage
+import kpis
+import queries
+from connexion import creer_engine
+
+FORMATS = ["csv", "parquet", "json"]
+DOSSIER = "rapports"
+# Un lot de rapports lit la base dans l'état du lancement : une seule version pour les caches kpis.py
+VERSION = "rapport"
+
+# 🔌 Lecteur du processus courant, créé par initialiser() (dans chaque processus du pool)
+_lire = None
+
+
+def initialiser(avec_esquisses=False):
+    global _lire
+    kpis.ESQUISSES = avec_esquisses
+    _lire = queries.lecteur(creer_engine())
+
+
+# 🛒 Lignes de commande d'analysis.py, lues et préparées une fois par processus
+@lru_cache(maxsize=1)
+def lignes_achats(lire):
+    return achats.preparer(queries.commandes_achats(lire))
+
+
+def nom_rapport(annee, fournisseur):
+    return f"annee={annee or 'toutes'}_fournisseur={fournisseur or 'tous'}"
+
+
+# 📊 Tous les KPIs d'une combinaison (année, fournisseur) : un DataFrame par table du rapport
+def rapport(lire, annee=None, fournisseur=None):
+    cle = (lire, VERSION, annee, fournisseur)
+    indicateurs = dict(kpis.indicateurs(*cle))
+    top_qte, top_cost = indicateurs.pop("top_qte"), indicateurs.pop("top_cost")
+    indicateurs["article_plus_commande"] = top_qte["designation"] if top_qte is not None else None
+    indicateurs["article_plus_couteux"] = top_cost["designation"] if top_cost is not None else None
+    indicateurs.update(kpis.indicateurs_fournisseurs(*cle))
+
+    df = lignes_achats(lire)
+    masque = pd.Series(True, index=df.index)
+    if annee:
+        masque &= df['date_commande'].dt.year == int(annee)
+    if fournisseur:
+        masque &= df['fournisseur_id'] == fournisseur
+    selection = df[masque]
+    agregats = achats.agreger(selection)
+    indicateurs["total_montant_achats"] = agregats["total_montant"]
+    indicateurs["total_quantite_achats"] = agregats["total_quantite"]
+    evolution = (
+        affichage.serie(selection, 'date_commande', 'montant_commande')[0] if not selection.empty
+        else pd.DataFrame(columns=['date_commande', 'montant_commande'])
+    )
+
+    return {
+        "indicateurs": pd.DataFrame([{"annee": annee, "fournisseur": fournisseur, **indicateurs}]),
+        "top_fournisseurs": kpis.top_fournisseurs(*cle),
+        "quantites_mensuelles": kpis.quantites_mensuelles(*cle),
+        "volatilite": kpis.volatilite(*cle),
+        "articles_commandes": kpis.articles_commandes(*cle),
+        "articles_non_commandes": kpis.articles_non_commandes(*cle),
+        "top_surstock": kpis.top_surstock(*cle),
+        "top_sousstock": kpis.top_sousstock(*cle),
+        "montant_par_annee": kpis.montant_par_annee(*cle),
+        "top_articles_achats": agregats["top_articles"],
+        "repartition_type_achat": agregats["repartition_type_achat"],
+        "evolution_montant": evolution,
+    }
+
+
+# 💾 csv / parquet : un fichier par table dans un répertoire par rapport ; json : un seul fichier
+def exporter(tables, dossier, nom, format="csv"):
+    os.makedirs(dossier, exist_ok=True)
+    if format == "json":
+        contenu = {
+            table: json.loads(df.to_json(orient="records", date_format="iso", force_ascii=False))
+            for table, df in tables.items()
+        }
+        chemin = os.path.join(dossier, nom + ".json")
+        with open(chemin, "w", encoding="utf-8") as f:
+            json.dump(contenu, f, ensure_ascii=False, indent=2)
+        return chemin
+
+    chemin = os.path.join(dossier, nom)
+    os.makedirs(chemin, exist_ok=True)
+    for table, df in tables.items():
+        if format == "parquet":
+            df.to_parquet(os.path.join(chemin, table + ".parquet"), index=False)
+        else:
+            df.to_csv(os.path.join(chemin, table + ".csv"), index=False)
+    return chemin
+
+
+def generer(combinaison, dossier, format):
+    annee, fournisseur = combinaison
+    debut = time.perf_counter()
+    chemin = exporter(rapport(_lire, annee, fournisseur), dossier, nom_rapport(annee, fournisseur), format)
+    return chemin, time.perf_counter() - debut
+
+
+# 📋 Combinaisons demandées ; avec --tout, celles présentes dans rollup_fournisseur_annee
+def combinaisons(lire, annees=None, fournisseurs=None, tout=False):
+    if tout:
+        paires = queries.annees_fournisseurs(lire)
+        annees = [int(a) for a in sorted(paires["annee"].unique())]
+        return ([(None, None)] + [(a, None) for a in annees]
+                + [(int(a), f) for a, f in paires[["annee", "fournisseur_id"]].itertuples(index=False)])
+    return [(a, f) for a in (annees or [None]) for f in (fournisseurs or [None])]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Rapports KPIs ONCF sans Streamlit")
+    parser.add_argument("--annees", type=int, nargs="*", help="années (défaut : tout l'historique)")
+    parser.add_argument("--fournisseurs", nargs="*", help="fournisseurs (défaut : tous confondus)")
+    parser.add_argument("--tout", action="store_true",
+                        help="toutes les années et tous les fournisseurs présents, plus l'ensemble")
+    parser.add_argument("--format", choices=FORMATS, default="csv")
+    parser.add_argument("--dossier", default=DOSSIER)
+    parser.add_argument("--workers", type=int, default=1, help="processus en parallèle (1 = séquentiel)")
+    parser.add_argument("--esquisses", action="store_true",
+                        help="KPIs fournisseurs et top 5 de tout l'historique tirés des esquisses (cf. esquisses.py), "
+                             "au lieu des requêtes exactes")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    debut = time.perf_counter()
+    initialiser(args.esquisses)
+    a_generer = combinaisons(_lire, args.annees, args.fournisseurs, args.tout)
+
+    if args.workers > 1:
+        # ⚡ Un rapport par tâche ; les combinaisons d'une même année restent groupées par processus
+        with ProcessPoolExecutor(max_workers=args.workers, initializer=initialiser,
+                                 initargs=(args.esquisses,)) as pool:
+            taille = max(1, len(a_generer) // (args.workers * 4))
+            resultats = list(pool.map(generer, a_generer, [args.dossier] * len(a_generer),
+                                      [args.format] * len(a_generer), chunksize=taille))
+    else:
+        resultats = [generer(c, args.dossier, args.format) for c in a_generer]
+
+    for chemin, secondes in resultats:
+        print(f"  {chemin:<60}{secondes:>8.2f} s")
+    print(f"✅ {len(resultats)} rapport(s) dans {args.dossier} en {time.perf_counter() - debut:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
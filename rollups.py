@@ -0,0 +1,132 @@
+# 🧮 Tables d'agrégats (rollups) construites à l'ingestion et lues par les dashboards
+from schema import SUFFIXE_STAGING, echanger_tables, liste_colonnes, table_existe
+
+# 📅 Dimensions temporelles dérivées de date_commande
+ANNEE = ("annee", "YEAR(date_commande)", "SMALLINT")
+MOIS = ("mois", "CAST(DATE_FORMAT(date_commande, '%Y-%m-01') AS DATE)", "DATE")
+
+MESURES_COMMANDES = [
+    ("quantite", "SUM(quantite)", "DOUBLE"),
+    ("montant_commande", "SUM(montant_commande)", "DOUBLE"),
+    ("nb_lignes", "COUNT(*)", "INT"),
+]
+
+# 📋 Chaque rollup : table source, colonnes de regroupement, mesures et colonne de rafraîchissement
+# (seules les valeurs de cette colonne touchées par de nouvelles lignes sont recalculées)
+ROLLUPS = {
+    "rollup_article": {
+        "source": "commandes",
+        "groupes": [("article_id", "article_id", "VARCHAR(20)")],
+        "mesures": MESURES_COMMANDES,
+        "rafraichir_par": "article_id",
+    },
+    "rollup_article_annee": {
+        "source": "commandes",
+        "groupes": [("article_id", "article_id", "VARCHAR(20)"), ANNEE],
+        "mesures": MESURES_COMMANDES,
+        "rafraichir_par": "article_id",
+    },
+    "rollup_article_mois": {
+        "source": "commandes",
+        "groupes": [("article_id", "article_id", "VARCHAR(20)"), ANNEE, MOIS],
+        "mesures": MESURES_COMMANDES,
+        "rafraichir_par": "article_id",
+    },
+    "rollup_fournisseur_annee": {
+        "source": "commandes",
+        "groupes": [("fournisseur_id", "fournisseur_id", "VARCHAR(20)"), ANNEE],
+        "mesures": MESURES_COMMANDES,
+        "rafraichir_par": "fournisseur_id",
+    },
+    # Grain le plus fin, nécessaire dès qu'un filtre fournisseur est combiné à un regroupement par article
+    "rollup_article_fournisseur_mois": {
+        "source": "commandes",
+        "groupes": [
+            ("article_id", "article_id", "VARCHAR(20)"),
+            ("fournisseur_id", "fournisseur_id", "VARCHAR(20)"),
+            ANNEE,
+            MOIS,
+        ],
+        "mesures": MESURES_COMMANDES,
+        "rafraichir_par": "article_id",
+    },
+    "rollup_dm_article": {
+        "source": "demandes_matiere",
+        "groupes": [("article_id", "article_id", "VARCHAR(20)")],
+        "mesures": [
+            ("quantite_dm", "SUM(quantite)", "DOUBLE"),
+            ("nb_dm", "COUNT(*)", "INT"),
+        ],
+        "rafraichir_par": "article_id",
+    },
+}
+
+
+def rollups_de(source):
+    return [nom for nom, spec in ROLLUPS.items() if spec["source"] == source]
+
+
+def creer_rollup(cursor, nom, cible=None):
+    cible = cible or nom
+    spec = ROLLUPS[nom]
+    definitions = [f"`{col}` {type_sql}" for col, _, type_sql in spec["groupes"] + spec["mesures"]]
+    groupes = [col for col, _, _ in spec["groupes"]]
+    # Clé unique plutôt que primaire : annee/mois sont NULL pour les dates invalides
+    definitions.append(f"UNIQUE KEY uk_{nom} ({liste_colonnes(groupes)})")
+    if spec["rafraichir_par"] != groupes[0]:
+        definitions.append(f"KEY idx_{nom}_rafraichissement (`{spec['rafraichir_par']}`)")
+    colonnes = ",\n    ".join(definitions)
+    cursor.execute(f"DROP TABLE IF EXISTS {cible}")
+    cursor.execute(f"CREATE TABLE {cible} (\n    {colonnes}\n)")
+
+
+def requete_agregat(nom, condition=""):
+    spec = ROLLUPS[nom]
+    selection = ", ".join(f"{expr} AS `{col}`" for col, expr, _ in spec["groupes"] + spec["mesures"])
+    groupes = ", ".join(f"`{col}`" for col, _, _ in spec["groupes"])
+    where = f"WHERE {condition}" if condition else ""
+    return f"SELECT {selection} FROM {spec['source']} src {where} GROUP BY {groupes}"
+
+
+# 🔁 Reconstruction complète dans une table staging puis échange atomique
+def reconstruire(cursor, source):
+    for nom in rollups_de(source):
+        staging = nom + SUFFIXE_STAGING
+        creer_rollup(cursor, nom, staging)
+        cursor.execute(f"INSERT INTO {staging} {requete_agregat(nom)}")
+        echanger_tables(cursor, nom, staging)
+
+
+def table_impact(nom_colonne):
+    return f"impact_{nom_colonne}"
+
+
+# 🎯 Valeurs des colonnes de rafraîchissement touchées par le delta (nouvelles valeurs et,
+# pour les lignes modifiées, anciennes valeurs), à collecter AVANT la fusion du delta
+def collecter_impacts(cursor, source, delta, jointure):
+    for col in sorted({ROLLUPS[nom]["rafraichir_par"] for nom in rollups_de(source)}):
+        impact = table_impact(col)
+        cursor.execute(f"DROP TEMPORARY TABLE IF EXISTS {impact}")
+        cursor.execute(f"CREATE TEMPORARY TABLE {impact} (`{col}` VARCHAR(20), UNIQUE KEY ({col}))")
+        cursor.execute(f"INSERT IGNORE INTO {impact} SELECT DISTINCT s.`{col}` FROM {delta} s")
+        cursor.execute(f"""
+            INSERT IGNORE INTO {impact}
+            SELECT DISTINCT t.`{col}` FROM {source} t JOIN {delta} s ON {jointure}
+        """)
+
+
+def rollups_presents(cursor, source):
+    return all(table_existe(cursor, nom) for nom in rollups_de(source))
+
+
+# ♻️ Rafraîchissement incrémental, dans la transaction de la fusion : seuls les groupes
+# dont la colonne de rafraîchissement a été touchée sont supprimés puis recalculés
+def rafraichir(cursor, source):
+    for nom in rollups_de(source):
+        col = ROLLUPS[nom]["rafraichir_par"]
+        impact = table_impact(col)
+        # <=> retrouve aussi le groupe NULL (ex. fournisseur absent), que IN ne retient jamais.
+        # La table d'impact est TEMPORARY : une seule mention par requête (sinon erreur 1137)
+        cursor.execute(f"DELETE r FROM {nom} r JOIN {impact} i ON r.`{col}` <=> i.`{col}`")
+        condition = f"EXISTS (SELECT 1 FROM {impact} i WHERE i.`{col}` <=> src.`{col}`)"
+        cursor.execute(f"INSERT INTO {nom} {requete_agregat(nom, condition)}")
@@ -0,0 +1,173 @@
+# 🧱 Schéma des tables ONCF : colonnes, clés et index, partagé par ingest.py et les benchmarks
+
+# 🏷️ Suffixes des tables temporaires utilisées pour l'échange atomique
+SUFFIXE_STAGING = "_staging"
+SUFFIXE_ANCIEN = "_ancien"
+
+# 📋 Définition des tables : fichier source et colonnes (ordre du CSV)
+TABLES = {
+    "articles": {
+        "fichier": "data/Article.csv",
+        "colonnes": [
+            ("article_id", "VARCHAR(20)"),
+            ("chapitre", "INT"),
+            ("lettre_cle", "VARCHAR(5)"),
+            ("unite_distribution", "INT"),
+            ("direction", "VARCHAR(50)"),
+            ("classe_article", "VARCHAR(50)"),
+            ("designation", "VARCHAR(100)"),
+            ("methode_reaprrovisionnement", "VARCHAR(50)"),
+            ("article_organisation", "INT"),
+            ("famille_article", "INT"),
+            ("type_achat", "INT"),
+            ("pu_annee_prec", "FLOAT"),
+            ("pu_annee_cours", "FLOAT"),
+            ("pu_dernier_cout_achat", "FLOAT"),
+            ("valeur_stock", "FLOAT"),
+            ("quantite_stock", "FLOAT"),
+        ],
+        "cle": ["article_id"],
+        "cle_primaire": True,
+        "index": {},
+    },
+    "commandes": {
+        "fichier": "data/Commande.csv",
+        "colonnes": [
+            ("commande_id", "INT"),
+            ("date_commande", "DATETIME"),
+            ("quantite", "FLOAT"),
+            ("fournisseur_id", "VARCHAR(20)"),
+            ("article_id", "VARCHAR(20)"),
+            ("libelle_article", "VARCHAR(100)"),
+            ("type_achat", "VARCHAR(20)"),
+            ("montant_commande", "FLOAT"),
+            ("Montant Offre", "FLOAT"),
+            ("date", "DATETIME"),
+            ("mode_paiement", "VARCHAR(50)"),
+        ],
+        # Commande.csv répète (commande_id, article_id, date_commande) avec des quantités
+        # différentes : « ligne » numérote ces répétitions pour rendre la clé unique.
+        # « anomalies » : masque de bits posé à l'ingestion (cf. anomalies.py), 0 = ligne saine
+        "colonnes_calculees": [("ligne", "INT"), ("anomalies", "TINYINT UNSIGNED")],
+        # date_commande peut être NULL (date invalide) : clé unique plutôt que clé primaire
+        "cle": ["commande_id", "article_id", "date_commande", "ligne"],
+        "cle_primaire": False,
+        "colonne_date": "date_commande",
+        # (article_id, date_commande) sert aussi les recherches sur article_id seul
+        "index": {
+            "idx_commandes_article_date": ["article_id", "date_commande"],
+            "idx_commandes_fournisseur": ["fournisseur_id"],
+            "idx_commandes_date": ["date_commande"],
+            # « anomalies = 0 » (lignes saines), éventuellement sur une période
+            "idx_commandes_anomalies": ["anomalies", "date_commande"],
+        },
+    },
+    "fournisseurs": {
+        "fichier": "data/Fournisseur.csv",
+        "colonnes": [
+            ("famille_article", "INT"),
+            ("fournisseur_id", "VARCHAR(20)"),
+            ("article_id", "VARCHAR(20)"),
+        ],
+        # Pas de clé naturelle : la table est toujours remplacée en entier
+        "cle": None,
+        "cle_primaire": False,
+        "index": {
+            "idx_fournisseurs_fournisseur": ["fournisseur_id"],
+            "idx_fournisseurs_article": ["article_id"],
+        },
+    },
+    "demandes_matiere": {
+        "fichier": "data/DM.csv",
+        "colonnes": [
+            ("dm_id", "INT"),
+            ("article_id", "VARCHAR(20)"),
+            ("quantite", "FLOAT"),
+            ("direction", "VARCHAR(50)"),
+        ],
+        "cle": ["dm_id"],
+        "cle_primaire": True,
+        "index": {
+            "idx_dm_article": ["article_id"],
+        },
+    },
+}
+
+
+def colonnes_table(nom):
+    return TABLES[nom]["colonnes"] + TABLES[nom].get("colonnes_calculees", [])
+
+
+def liste_colonnes(colonnes):
+    return ", ".join(f"`{col}`" for col in colonnes)
+
+
+# 🔑 DDL de la table : types, clé primaire (colonnes NOT NULL) ou clé unique naturelle
+def definition_table(nom, cible=None, index_secondaires=True):
+    cible = cible or nom
+    spec = TABLES[nom]
+    cle_primaire = spec["cle"] if spec["cle_primaire"] else []
+    definitions = [
+        f"`{col}` {type_sql}" + (" NOT NULL" if col in cle_primaire else "")
+        for col, type_sql in colonnes_table(nom)
+    ]
+    if cle_primaire:
+        definitions.append(f"PRIMARY KEY ({liste_colonnes(cle_primaire)})")
+    elif spec["cle"]:
+        definitions.append(f"UNIQUE KEY uk_{nom} ({liste_colonnes(spec['cle'])})")
+    if index_secondaires:
+        definitions += [f"KEY {index} ({liste_colonnes(cols)})" for index, cols in spec["index"].items()]
+    colonnes = ",\n    ".join(definitions)
+    return f"CREATE TABLE {cible} (\n    {colonnes}\n)"
+
+
+def creer_table(cursor, nom, cible=None, index_secondaires=True):
+    cible = cible or nom
+    cursor.execute(f"DROP TABLE IF EXISTS {cible}")
+    cursor.execute(definition_table(nom, cible, index_secondaires))
+
+
+# 📇 Index secondaires ajoutés en une seule passe, après le chargement en masse
+def ajouter_index(cursor, nom, cible=None):
+    cible = cible or nom
+    index = TABLES[nom]["index"]
+    if index:
+        ajouts = ", ".join(f"ADD KEY {nom_index} ({liste_colonnes(cols)})" for nom_index, cols in index.items())
+        cursor.execute(f"ALTER TABLE {cible} {ajouts}")
+
+
+def table_existe(cursor, nom):
+    cursor.execute("SHOW TABLES LIKE %s", (nom,))
+    return cursor.fetchone() is not None
+
+
+def colonnes_existantes(cursor, nom):
+    cursor.execute(f"SHOW COLUMNS FROM {nom}")
+    return [ligne[0] for ligne in cursor.fetchall()]
+
+
+# 🔀 Échange atomique : les lecteurs voient l'ancienne table ou la nouvelle, jamais un état partiel
+def echanger_tables(cursor, nom, staging):
+    ancien = nom + SUFFIXE_ANCIEN
+    cursor.execute(f"DROP TABLE IF EXISTS {ancien}")
+    if table_existe(cursor, nom):
+        cursor.execute(f"RENAME TABLE {nom} TO {ancien}, {staging} TO {nom}")
+        cursor.execute(f"DROP TABLE {ancien}")
+    else:
+        cursor.execute(f"RENAME TABLE {staging} TO {nom}")
+
+
+# 🔀 Échange de plusieurs tables staging en un seul RENAME TABLE, atomique pour l'ensemble
+def echanger_ensemble(cursor, noms):
+    if not noms:
+        return
+    renommages = []
+    for nom in noms:
+        ancien = nom + SUFFIXE_ANCIEN
+        cursor.execute(f"DROP TABLE IF EXISTS {ancien}")
+        if table_existe(cursor, nom):
+            renommages.append(f"{nom} TO {ancien}")
+        renommages.append(f"{nom + SUFFIXE_STAGING} TO {nom}")
+    cursor.execute(f"RENAME TABLE {', '.join(renommages)}")
+    for nom in noms:
+        cursor.execute(f"DROP TABLE IF EXISTS {nom + SUFFIXE_ANCIEN}")
@@ -0,0 +1,142 @@
+# 🧪 Validation vectorisée des CSV, appliquée par ingest.py à chaque morceau avant chargement
+# Les identifiants sont nettoyés une seule fois ici (les dashboards n'ont plus à les « strip »),
+# puis types, bornes, intégrité référentielle et unicité de la clé primaire sont vérifiés colonne par colonne.
+# Les lignes rejetées partent en quarantaine (data/quarantaine/<table>.csv) avec leurs motifs.
+import os
+
+import pandas as pd
+
+from schema import TABLES
+
+DOSSIER_QUARANTAINE = "data/quarantaine"
+
+# 📏 Règles par table
+# ids : identifiants à nettoyer (espaces retirés, chaîne vide → NULL)
+# obligatoires : colonnes qui ne peuvent pas être NULL
+# positifs : colonnes numériques qui ne peuvent pas être négatives
+# references : colonne → (table, colonne) dont elle doit reprendre une valeur
+REGLES = {
+    "articles": {
+        "ids": ["article_id"],
+        "obligatoires": ["article_id"],
+        "positifs": ["pu_annee_prec", "pu_annee_cours", "pu_dernier_cout_achat"],
+        "references": {},
+    },
+    "commandes": {
+        "ids": ["article_id", "fournisseur_id"],
+        "obligatoires": ["commande_id", "article_id"],
+        "positifs": ["quantite", "montant_commande", "Montant Offre"],
+        "references": {
+            "article_id": ("articles", "article_id"),
+            "fournisseur_id": ("fournisseurs", "fournisseur_id"),
+        },
+    },
+    "fournisseurs": {
+        "ids": ["fournisseur_id", "article_id"],
+        "obligatoires": ["fournisseur_id"],
+        "positifs": [],
+        "references": {},
+    },
+    "demandes_matiere": {
+        "ids": ["article_id"],
+        "obligatoires": ["dm_id", "article_id"],
+        "positifs": ["quantite"],
+        "references": {"article_id": ("articles", "article_id")},
+    },
+}
+
+TYPES_NUMERIQUES = {"INT": "Int64", "FLOAT": "float64"}
+
+
+def nettoyer_ids(serie):
+    serie = serie.astype("string").str.strip()
+    return serie.mask(serie == "")
+
+
+# 📚 Valeurs connues d'une colonne de référence, lues directement dans son CSV
+# (indépendant de l'ordre de chargement) ; None si le fichier est absent
+def charger_referentiel(nom, colonne):
+    fichier = TABLES[nom]["fichier"]
+    if not os.path.exists(fichier):
+        return None
+    noms = [col for col, _ in TABLES[nom]["colonnes"]]
+    serie = pd.read_csv(fichier, header=0, names=noms, usecols=[colonne], dtype="string",
+                        na_values=["null"])[colonne]
+    return pd.Index(nettoyer_ids(serie).dropna().unique())
+
+
+def referentiels(nom):
+    return {
+        col: charger_referentiel(table, col_ref)
+        for col, (table, col_ref) in REGLES[nom]["references"].items()
+    }
+
+
+class Validateur:
+    def __init__(self, nom, references=None, dossier=None):
+        dossier = dossier or DOSSIER_QUARANTAINE
+        self.nom = nom
+        self.regles = REGLES[nom]
+        self.references = referentiels(nom) if references is None else references
+        self.quarantaine = os.path.join(dossier, f"{nom}.csv")
+        self.rejetees = 0
+        # 🔑 Clé primaire déjà chargée, d'un morceau à l'autre (empreintes, cf. anomalies.py)
+        self.cle = TABLES[nom]["cle"] if TABLES[nom]["cle_primaire"] else None
+        self.cles_vues = pd.Index([], dtype="uint64")
+        os.makedirs(dossier, exist_ok=True)
+        if os.path.exists(self.quarantaine):
+            os.remove(self.quarantaine)
+
+    # ✅ Renvoie le morceau nettoyé, sans les lignes rejetées (écrites en quarantaine)
+    def valider(self, df):
+        brut = df.copy()
+        motifs = pd.Series("", index=df.index, dtype="object")
+
+        def rejeter(masque, motif):
+            nonlocal motifs
+            masque = masque.fillna(False).astype(bool)
+            motifs = motifs.mask(masque, motifs + motif + "; ")
+
+        for col in self.regles["ids"]:
+            df[col] = nettoyer_ids(df[col])
+        for col in self.regles["obligatoires"]:
+            texte = df[col].astype("string").str.strip()
+            rejeter(texte.isna() | (texte == ""), f"{col} manquant")
+
+        # Colonnes numériques lues en texte : une valeur présente mais non convertible est rejetée
+        for col, type_sql in TABLES[self.nom]["colonnes"]:
+            if type_sql not in TYPES_NUMERIQUES:
+                continue
+            texte = df[col].astype("string").str.strip()
+            valeurs = pd.to_numeric(texte, errors="coerce")
+            rejeter(texte.notna() & (texte != "") & valeurs.isna(), f"{col} non numérique")
+            if type_sql == "INT":
+                rejeter(valeurs.notna() & (valeurs % 1 != 0), f"{col} non entier")
+                valeurs = valeurs.where(valeurs % 1 == 0).astype("Int64")
+            df[col] = valeurs.astype(TYPES_NUMERIQUES[type_sql])
+
+        for col in self.regles["positifs"]:
+            rejeter(df[col] < 0, f"{col} négatif")
+        for col, connues in self.references.items():
+            if connues is not None:
+                rejeter(df[col].notna() & ~df[col].isin(connues), f"{col} inconnu")
+
+        # Première occurrence gardée, les suivantes rejetées : le chargement par executemany
+        # échouerait (erreur 1062) là où LOAD DATA les ignorerait en silence
+        if self.cle is not None:
+            empreintes = pd.Series(pd.util.hash_pandas_object(df[self.cle], index=False).to_numpy(), index=df.index)
+            candidates = empreintes[motifs == ""]
+            doublons = candidates.duplicated() | candidates.isin(self.cles_vues)
+            rejeter(doublons.reindex(df.index, fill_value=False), "clé dupliquée")
+            self.cles_vues = self.cles_vues.append(pd.Index(candidates[~doublons].to_numpy()))
+
+        rejet = motifs != ""
+        if rejet.any():
+            self.mettre_en_quarantaine(brut[rejet], motifs[rejet])
+        return df[~rejet].copy()
+
+    def mettre_en_quarantaine(self, lignes, motifs):
+        lignes = lignes.assign(motifs=motifs.str.rstrip("; "))
+        lignes.to_csv(self.quarantaine, mode="a", index=False,
+                      header=not os.path.exists(self.quarantaine))
+        self.rejetees += len(lignes)